@@ -0,0 +1,223 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import plotly
+import polars as pl
+from loguru import logger
+from plotly.io.json import to_json_plotly
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from datAxis import XAxisIndex  # noqa: E402
+from datCache import FileCache  # noqa: E402
+from datDecimate import DEFAULT_MAX_POINTS, decimate_window  # noqa: E402
+from datFigures import histogram_bar, histogram_figure, line_figure  # noqa: E402
+from datHistogram import BIN_RULES, DEFAULT_BINS, ColumnHistogram  # noqa: E402
+from datLoader import DatFile  # noqa: E402
+from datPyramid import ColumnPyramid  # noqa: E402
+from datStats import fused_stats, median  # noqa: E402
+from datStream import summarize  # noqa: E402
+
+from gendat import BASE_COLUMNS, write_dat  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+X_COLUMN = "SimTime"
+Y_COLUMNS = ("Velocity", "XPos")
+
+# Generated files need at least the columns up to the last plotted one
+MIN_COLUMNS = max(BASE_COLUMNS.index(column) for column in Y_COLUMNS) + 1
+
+# Part of the x range a zoom benchmark looks at, from the middle of the file
+ZOOM_FRACTION = 0.1
+
+
+def max_rss_mb():
+    """Peak resident set size of this process so far, or None where it can't be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def measure(func, repeat):
+    """Best wall time of func over repeat runs, then one more run under tracemalloc for its peak.
+
+    tracemalloc sees numpy buffers and Python objects but not polars' own
+    allocations, which only show up in the process max RSS.
+    Returns (seconds, peak_mb, result of the last run).
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 1024 / 1024, result
+
+
+def bench_file(path, rows, columns, repeat, max_points, cache_dir):
+    """Time each stage the GUI runs for one file. Returns a list of result records."""
+    results = []
+
+    def record(stage, func, **extra):
+        seconds, peak_mb, result = measure(func, repeat)
+        results.append({
+            "stage": stage, "rows": rows, "columns": columns,
+            "seconds": seconds, "rows_per_second": rows / seconds if seconds else None,
+            "tracemalloc_peak_mb": peak_mb, **extra,
+        })
+        logger.info(f"{rows} x {columns} {stage}: {seconds * 1000:.1f} ms, peak {peak_mb:.1f} MB")
+        return result
+
+    # pick_dat_file / load_columns: header, then the x column and the first plotted columns
+    def open_file(cache=None):
+        dat_file = DatFile(path, cache=cache)
+        dat_file.load([X_COLUMN, *Y_COLUMNS])
+        return dat_file
+
+    dat_file = record("open", open_file)
+
+    cache = FileCache(cache_dir)
+    cache.store(path, pl.scan_csv(path, separator=" ", has_header=True))
+    record("open_cached", lambda: open_file(cache))
+
+    # prepare_columns: x index and a pyramid per plotted column
+    def index():
+        x_index = XAxisIndex(dat_file.array(X_COLUMN))
+        x_index.sorted_x
+        return x_index, {column: ColumnPyramid(dat_file.array(column)) for column in Y_COLUMNS}
+
+    x_index, pyramids = record("index", index)
+    x_range = (float(x_index.sorted_x[0]), float(x_index.sorted_x[-1]))
+
+    def trace(column, start=None, end=None):
+        pyramid = pyramids[column]
+        return decimate_window(x_index.x, pyramid.data, start, end, max_points, pyramid=pyramid, x_index=x_index)
+
+    # plot_selected_column: decimate both traces, build the figure and serialize it for the browser
+    def plot():
+        fig = line_figure(X_COLUMN, Y_COLUMNS[0], trace(Y_COLUMNS[0]), Y_COLUMNS[1], trace(Y_COLUMNS[1]), x_range=x_range)
+        return to_json_plotly(fig)
+
+    figure = record("plot", plot)
+    results[-1]["figure_json_bytes"] = len(figure)
+
+    # compute_stats: summary stats of each plotted column
+    record("stats", lambda: [fused_stats(pyramids[column].data) for column in Y_COLUMNS])
+
+    # add_zoom_stats: refill the traces for a window and take its stats from the pyramids
+    middle = (x_range[0] + x_range[1]) / 2
+    half = (x_range[1] - x_range[0]) * ZOOM_FRACTION / 2
+    start, end = middle - half, middle + half
+
+    def zoom():
+        traces = [trace(column, start, end) for column in Y_COLUMNS]
+        window = x_index.window(start, end)
+        stats = []
+        for column in Y_COLUMNS:
+            window_stats = pyramids[column].range_stats(window.start, window.stop)
+            window_stats["median"] = median(pyramids[column].data[window])
+            stats.append(window_stats)
+        return traces, stats
+
+    record("zoom", zoom)
+
+    # plot_histogram: base counts, binning and the figure sent to the browser
+    def histogram():
+        bars = [
+            histogram_bar(column, *ColumnHistogram(pyramids[column].data).bins(BIN_RULES[0], DEFAULT_BINS))
+            for column in Y_COLUMNS
+        ]
+        return to_json_plotly(histogram_figure(bars, *Y_COLUMNS))
+
+    figure = record("histogram", histogram)
+    results[-1]["figure_json_bytes"] = len(figure)
+
+    # Files over the streaming threshold: one bounded-memory pass over every column
+    numeric = DatFile(path).numeric_columns()
+    record("stream", lambda: summarize(DatFile(path), numeric, [X_COLUMN], max_points))
+
+    return results
+
+
+def parse_sizes(text):
+    return [int(size) for size in text.split(",") if size.strip()]
+
+
+def main(argv=None):
+    """Benchmark the load, plot and stats paths on synthetic files and write the results as JSON."""
+    parser = argparse.ArgumentParser(
+        prog="bench",
+        description="Time DatPlot's load, plot, zoom, stats and histogram paths on synthetic .dat files.",
+    )
+    parser.add_argument("-r", "--rows", type=parse_sizes, default=[100_000, 1_000_000], help="comma separated row counts (default: 100000,1000000)")
+    parser.add_argument("-c", "--columns", type=parse_sizes, default=[6, 32], help="comma separated column counts (default: 6,32)")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="timed runs per stage; the best is reported (default: 3)")
+    parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS, help=f"points per trace (default: {DEFAULT_MAX_POINTS})")
+    parser.add_argument("-o", "--out", help="JSON file to write (default: standard output)")
+    args = parser.parse_args(argv)
+
+    # Per-load messages from the modules under test would drown out the results
+    for module in ("datLoader", "datCache"):
+        logger.disable(module)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="datplot-bench-") as work:
+        for rows in args.rows:
+            for columns in args.columns:
+                columns = max(columns, MIN_COLUMNS)
+                path = os.path.join(work, f"bench_{rows}x{columns}.dat")
+                write_dat(path, rows, columns)
+                logger.info(f"Generated {path} ({os.path.getsize(path) / 1024 / 1024:.0f} MB)")
+                for record in bench_file(path, rows, columns, args.repeat, args.max_points, os.path.join(work, "cache")):
+                    record["file_mb"] = os.path.getsize(path) / 1024 / 1024
+                    results.append(record)
+                os.remove(path)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "polars": pl.__version__,
+            "plotly": plotly.__version__,
+            "repeat": args.repeat,
+            "max_points": args.max_points,
+            "max_rss_mb": max_rss_mb(),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text)
+        logger.info(f"Wrote {len(results)} results to {args.out}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
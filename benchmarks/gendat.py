@@ -0,0 +1,67 @@
+import argparse
+import sys
+
+import numpy as np
+import polars as pl
+from loguru import logger
+
+
+# Simulator frame rate; SimTime advances by 1 / RATE per row
+RATE = 60
+
+# Columns every generated file starts with, in the simulator's usual order
+BASE_COLUMNS = ["SimTime", "DatTime", "MediaTime", "XPos", "Velocity", "Brake"]
+
+
+def synthetic_frame(rows, columns=len(BASE_COLUMNS), seed=0):
+    """A DataFrame shaped like a simulator .dat file.
+
+    SimTime/DatTime/MediaTime are clocks, Velocity is a smooth noisy signal and
+    XPos its integral, and Brake is mostly zeros, which exercises the zero
+    filter. Columns past the base ones are extra noisy signals named Signal1,
+    Signal2 and so on. The same seed always gives the same data.
+    """
+    rng = np.random.default_rng(seed)
+    sim_time = np.arange(rows) / RATE
+    velocity = 20 + 10 * np.sin(sim_time / 30) + rng.normal(0, 0.5, rows)
+    brake = np.where(rng.random(rows) < 0.8, 0.0, rng.random(rows))
+
+    data = {
+        "SimTime": sim_time,
+        "DatTime": sim_time + rng.normal(0, 1e-4, rows).cumsum() * 1e-3,
+        "MediaTime": np.round(sim_time, 2),
+        "XPos": np.cumsum(velocity) / RATE,
+        "Velocity": velocity,
+        "Brake": brake,
+    }
+    data = dict(list(data.items())[:columns])
+    for i in range(1, columns - len(data) + 1):
+        data[f"Signal{i}"] = np.sin(sim_time * rng.uniform(0.01, 1)) + rng.normal(0, 0.1, rows)
+    return pl.DataFrame(data)
+
+
+def write_dat(path, rows, columns=len(BASE_COLUMNS), seed=0):
+    """Write a synthetic space-separated .dat file with a header line. Returns its path."""
+    synthetic_frame(rows, columns, seed).write_csv(path, separator=" ")
+    return path
+
+
+def main(argv=None):
+    """Write one synthetic .dat file."""
+    parser = argparse.ArgumentParser(prog="gendat", description="Write a synthetic simulator-style .dat file.")
+    parser.add_argument("path", help="file to write")
+    parser.add_argument("-r", "--rows", type=int, default=1_000_000, help="rows (default: 1000000)")
+    parser.add_argument(
+        "-c", "--columns", type=int, default=len(BASE_COLUMNS),
+        help=f"columns, at least 1; past {len(BASE_COLUMNS)} extra signal columns are added (default: {len(BASE_COLUMNS)})",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    write_dat(args.path, args.rows, args.columns, args.seed)
+    logger.info(f"Wrote {args.rows} rows x {args.columns} columns to {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
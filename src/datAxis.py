@@ -0,0 +1,60 @@
+import numpy as np
+
+
+class XAxisIndex:
+    """Range lookups on an x column, by binary search instead of full-length masks.
+
+    Time columns (SimTime, DatTime, MediaTime) are monotonic in practice, so a
+    window is just a contiguous slice of rows. Unsorted columns fall back to a
+    cached argsort permutation.
+    """
+
+    def __init__(self, x) -> None:
+        self.x = np.asarray(x)
+        self.is_sorted = bool(np.all(self.x[1:] >= self.x[:-1]))
+        self._order = None
+        self._sorted_x = None
+
+    @property
+    def order(self):
+        """Row permutation that sorts x, computed on first use."""
+        if self._order is None:
+            self._order = np.argsort(self.x, kind="stable")
+            self._sorted_x = self.x[self._order]
+        return self._order
+
+    @property
+    def sorted_x(self):
+        """x in ascending order; x itself when it is already sorted."""
+        if self.is_sorted:
+            return self.x
+        if self._order is None:
+            self.order  # builds the sorted copy alongside the permutation
+        return self._sorted_x
+
+    def _bounds(self, start, end):
+        """Positions of [start, end] in the sorted x values."""
+        lo = np.searchsorted(self.sorted_x, start, side="left")
+        hi = np.searchsorted(self.sorted_x, end, side="right")
+        return int(lo), int(max(hi, lo))
+
+    def window(self, start, end):
+        """Rows with start <= x <= end.
+
+        Returns a slice for sorted x, so indexing a column with it gives a view.
+        For unsorted x it returns a view of the cached permutation instead.
+        """
+        lo, hi = self._bounds(start, end)
+        if self.is_sorted:
+            return slice(lo, hi)
+        return self.order[lo:hi]
+
+    def row_span(self, start, end):
+        """The smallest [lo, hi) run of rows containing every row in the window, or None if empty."""
+        lo, hi = self._bounds(start, end)
+        if hi <= lo:
+            return None
+        if self.is_sorted:
+            return lo, hi
+        rows = self.order[lo:hi]
+        return int(rows.min()), int(rows.max()) + 1
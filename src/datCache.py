@@ -0,0 +1,133 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from loguru import logger
+
+
+DEFAULT_MAX_MB = 8192
+DEFAULT_MAX_ENTRIES = 64
+
+
+class FileCache:
+    """Arrow IPC copies of opened .dat files, so reopening skips the text parse.
+
+    Entries are keyed by the file's path, size and mtime, so an edited file
+    gets a fresh entry, along with any sidecar files stored beside it. Reading an entry marks it as recently used, and the
+    least recently used entries are deleted once the cache is over max_mb.
+    """
+
+    def __init__(self, cache_dir, max_mb=DEFAULT_MAX_MB) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_mb) * 1024 * 1024
+        self._writing: set = set()
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def entry_path(self, path):
+        """Cache file for the current version of a .dat file, or None if it can't be stat'ed."""
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError):
+            return None
+        key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return self.cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.arrow"
+
+    def sidecar_path(self, path, kind):
+        """Small file of derived data (e.g. a column profile) kept with path's cache entry, or None."""
+        entry = self.entry_path(path)
+        return None if entry is None else entry.with_suffix(f".{kind}.json")
+
+    def lookup(self, path):
+        """Return the cached IPC file for path if there is one, marking it recently used."""
+        entry = self.entry_path(path)
+        if entry is None or not entry.exists():
+            return None
+        os.utime(entry)
+        logger.info(f"Using cached copy {entry.name} for {path}")
+        return entry
+
+    def store(self, path, scan):
+        """Write a LazyFrame of the file's contents to the cache, then evict old entries."""
+        entry = self.entry_path(path)
+        if entry is None:
+            return
+        with self._lock:
+            if entry in self._writing or entry.exists():
+                return
+            self._writing.add(entry)
+
+        temp = entry.with_suffix(".tmp")
+        try:
+            # Uncompressed so later opens can memory-map it
+            scan.sink_ipc(temp, compression=None)
+            os.replace(temp, entry)
+            logger.info(f"Cached {path} as {entry.name}")
+        except Exception as ex:
+            logger.error(f"Failed to cache {path}: {ex}")
+            temp.unlink(missing_ok=True)
+        finally:
+            with self._lock:
+                self._writing.discard(entry)
+
+        self.evict(keep=entry)
+
+    def store_in_background(self, path, scan):
+        """Run store() on a daemon thread so the caller isn't blocked by the full parse."""
+        threading.Thread(target=self.store, args=(path, scan), daemon=True).start()
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits in max_bytes, sparing keep."""
+        entries = sorted(self.cache_dir.glob("*.arrow"), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            try:
+                size = entry.stat().st_size
+                entry.unlink()
+                total -= size
+                for sidecar in self.cache_dir.glob(f"{entry.stem}.*.json"):
+                    sidecar.unlink(missing_ok=True)
+                logger.info(f"Evicted {entry.name} from the file cache")
+            except OSError:
+                # Still memory-mapped by an open file on Windows
+                continue
+
+
+class LRUCache:
+    """In-memory memo of computed results, evicting the least recently used past max_entries."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        """Return the result stored for key, marking it recently used, or default on a miss."""
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, value):
+        """Store a result, evicting the least recently used entry if over max_entries."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Return the result stored for key, calling compute() to fill it on a miss."""
+        if key in self._entries:
+            return self.get(key)
+
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        self._entries.clear()
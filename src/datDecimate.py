@@ -0,0 +1,88 @@
+import numpy as np
+
+
+# Number of points sent to the browser per trace. Roughly two per horizontal
+# pixel on a wide monitor, which is where extra points stop being visible.
+DEFAULT_MAX_POINTS = 4000
+
+
+def minmax_indices(y, max_points=DEFAULT_MAX_POINTS, offset=0):
+    """Return sorted indices into y that keep the min and max of each bucket."""
+    n = len(y)
+    if n <= max_points:
+        return np.arange(offset, offset + n)
+
+    # Each bucket contributes two points (its min and its max)
+    n_buckets = max(max_points // 2, 1)
+    bucket = int(np.ceil(n / n_buckets))
+    n_full = (n // bucket) * bucket
+
+    blocks = y[:n_full].reshape(-1, bucket)
+    starts = np.arange(0, n_full, bucket)
+    i_min = blocks.argmin(axis=1) + starts
+    i_max = blocks.argmax(axis=1) + starts
+
+    # The trailing partial bucket, if any
+    if n_full < n:
+        tail = y[n_full:]
+        i_min = np.append(i_min, tail.argmin() + n_full)
+        i_max = np.append(i_max, tail.argmax() + n_full)
+
+    # Interleave each bucket's min/max in the order they occur so lines stay monotonic in x
+    indices = np.empty(2 * len(i_min), dtype=np.int64)
+    indices[0::2] = np.minimum(i_min, i_max)
+    indices[1::2] = np.maximum(i_min, i_max)
+
+    # Always keep the end points so the trace spans the full range
+    indices = np.unique(np.concatenate(([0], indices, [n - 1])))
+    return indices + offset
+
+
+def minmax_decimate(x, y, max_points=DEFAULT_MAX_POINTS):
+    """Downsample x/y to about max_points samples while keeping peaks and dips."""
+    indices = minmax_indices(y, max_points)
+    return x[indices], y[indices]
+
+
+def decimate_window(x, y, start, end, max_points=DEFAULT_MAX_POINTS, pyramid=None, x_index=None):
+    """Downsample x/y with full detail budget spent on the visible [start, end] window.
+
+    Samples outside the window are kept at a coarse overview resolution so the
+    rangeslider still shows the whole file. If a ColumnPyramid for y is given the
+    buckets are read from it instead of rescanning y, and an XAxisIndex for x
+    finds the window by binary search instead of a full-length mask.
+    """
+    n = len(y)
+    if n <= max_points:
+        return x, y
+
+    if pyramid is not None:
+        bucket_indices = pyramid.minmax_indices
+    else:
+        def bucket_indices(lo, hi, points):
+            return minmax_indices(y[lo:hi], points, offset=lo)
+
+    if start is None or end is None:
+        indices = bucket_indices(0, n, max_points)
+        return x[indices], y[indices]
+
+    if x_index is not None:
+        span = x_index.row_span(start, end)
+    else:
+        in_window = np.flatnonzero((x >= start) & (x <= end))
+        span = (in_window[0], in_window[-1] + 1) if len(in_window) else None
+
+    if span is None or span == (0, n):
+        indices = bucket_indices(0, n, max_points)
+        return x[indices], y[indices]
+
+    # Pad by one sample on each side so lines run off the edges of the view
+    lo = max(span[0] - 1, 0)
+    hi = min(span[1] + 1, n)
+
+    overview = bucket_indices(0, n, max_points // 4)
+    overview = overview[(overview < lo) | (overview >= hi)]
+    detail = bucket_indices(lo, hi, max_points)
+
+    indices = np.union1d(overview, detail)
+    return x[indices], y[indices]
@@ -0,0 +1,144 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import plotly.io as pio
+from loguru import logger
+
+from datAxis import XAxisIndex
+from datDecimate import DEFAULT_MAX_POINTS, decimate_window
+from datFigures import histogram_bar, histogram_figure, line_figure
+from datHistogram import BASE_BINS, BIN_RULES, DEFAULT_BINS, ColumnHistogram
+from datLoader import DatFile
+from datPyramid import ColumnPyramid
+
+
+FORMATS = ["png", "jpg", "svg", "pdf", "webp"]
+
+
+def parse_y_spec(spec):
+    """'Velocity' plots one column, 'Velocity,XPos' puts the second on the right axis."""
+    columns = [column.strip() for column in spec.split(",") if column.strip()]
+    if not 1 <= len(columns) <= 2:
+        raise argparse.ArgumentTypeError(f"expected one or two comma separated columns, got '{spec}'")
+    return tuple(columns)
+
+
+def export_file(path, x_column, y_specs, out_dir, image_format, histogram, bin_rule, bins, max_points):
+    """Render every requested figure for one .dat file. Returns the paths written."""
+    dat_file = DatFile(path)
+    columns = {column for spec in y_specs for column in spec}
+    missing = sorted(column for column in columns | {x_column} if column not in dat_file)
+    if missing:
+        raise KeyError(f"columns not in file: {', '.join(missing)}")
+
+    # Parse every needed column in a single pass over the file
+    dat_file.load([x_column, *columns])
+    x_index = XAxisIndex(dat_file.array(x_column))
+    pyramids = {column: ColumnPyramid(dat_file.array(column)) for column in columns}
+
+    def trace(column):
+        pyramid = pyramids[column]
+        return decimate_window(x_index.x, pyramid.data, None, None, max_points, pyramid=pyramid, x_index=x_index)
+
+    x_range = (float(x_index.sorted_x[0]), float(x_index.sorted_x[-1])) if len(x_index.x) else (None, None)
+    stem = Path(path).stem
+    figures = []
+    targets = []
+    for spec in y_specs:
+        y_column_1 = spec[0]
+        y_column_2 = spec[1] if len(spec) > 1 else None
+        name = "_".join(spec)
+
+        fig = line_figure(
+            x_column,
+            y_column_1,
+            trace(y_column_1),
+            y_column_2,
+            trace(y_column_2) if y_column_2 else None,
+            x_range=x_range,
+        )
+        figures.append(fig)
+        targets.append(Path(out_dir) / f"{stem}_{name}_vs_{x_column}.{image_format}")
+
+        if histogram:
+            bars = [
+                histogram_bar(column, *ColumnHistogram(pyramids[column].data).bins(bin_rule, bins))
+                for column in spec
+            ]
+            figures.append(histogram_figure(bars, y_column_1, y_column_2))
+            targets.append(Path(out_dir) / f"{stem}_{name}_histogram.{image_format}")
+
+    # One kaleido browser session renders all of this file's figures
+    pio.write_images(figures, targets, format=image_format)
+    return targets
+
+
+def main(argv=None):
+    """Render plots for many .dat files without starting the GUI."""
+    parser = argparse.ArgumentParser(
+        prog="datplot-export",
+        description="Render DatPlot line plots (and optionally histograms) for every .dat file matching a glob.",
+    )
+    parser.add_argument("pattern", help="glob of .dat files, e.g. 'runs/**/*.dat' (quote it so the shell doesn't expand it)")
+    parser.add_argument("-x", "--x-column", default="SimTime", help="x axis column (default: SimTime)")
+    parser.add_argument(
+        "-y", "--y", dest="y_specs", action="append", type=parse_y_spec, required=True,
+        help="y column, or two comma separated columns for a second right-hand axis; repeat for more plots",
+    )
+    parser.add_argument("-o", "--out", default=".", help="directory to write images to (default: current directory)")
+    parser.add_argument("-f", "--format", default="png", choices=FORMATS, help="image format (default: png)")
+    parser.add_argument("--histogram", action="store_true", help="also render a histogram of each y spec")
+    parser.add_argument("--bin-rule", default=BIN_RULES[0], choices=BIN_RULES, help="histogram binning rule")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS, help="bin count for the 'Fixed count' rule")
+    parser.add_argument(
+        "--max-points", type=int, default=DEFAULT_MAX_POINTS,
+        help=f"points per trace after min/max decimation (default: {DEFAULT_MAX_POINTS})",
+    )
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    if not 1 <= args.bins <= BASE_BINS:
+        parser.error(f"--bins must be between 1 and {BASE_BINS}")
+
+    paths = sorted(glob.glob(args.pattern, recursive=True))
+    if not paths:
+        logger.error(f"No files match {args.pattern}")
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+
+    logger.info(f"Exporting {len(paths)} files with {args.workers} workers")
+    started = time.perf_counter()
+    images = 0
+    exported = []  # files that succeeded; the throughput counts only these
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(paths))) as pool:
+        futures = {
+            pool.submit(
+                export_file, path, args.x_column, args.y_specs, args.out, args.format,
+                args.histogram, args.bin_rule, args.bins, args.max_points,
+            ): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            try:
+                written = future.result()
+                images += len(written)
+                exported.append(futures[future])
+                logger.info(f"{futures[future]}: wrote {len(written)} images")
+            except Exception as ex:
+                logger.error(f"{futures[future]}: {ex}")
+
+    elapsed = time.perf_counter() - started
+    megabytes = sum(os.path.getsize(path) for path in exported) / 1024 / 1024
+    logger.info(
+        f"Rendered {images} images from {len(exported)}/{len(paths)} files in {elapsed:.1f}s "
+        f"({len(exported) / elapsed:.2f} files/s, {images / elapsed:.2f} images/s, {megabytes / elapsed:.1f} MB/s)"
+    )
+    return 1 if len(exported) < len(paths) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
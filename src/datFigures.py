@@ -0,0 +1,126 @@
+import numpy as np
+import plotly.graph_objects as go
+
+
+RENDER_MODES = ["auto", "svg", "webgl"]
+
+# Raw rows inside the x window, summed over the plotted columns, above which
+# "auto" draws with WebGL. Rows are counted before decimation, since the
+# decimated traces are capped at a few thousand points whatever the window.
+# SVG is crisper and handles hover better, but slows down long before WebGL does.
+WEBGL_ABOVE_ROWS = 500_000
+
+
+def use_webgl(mode, rows, threshold=WEBGL_ABOVE_ROWS):
+    """Whether a plot of this many raw rows in view should be drawn with Scattergl under the given render mode."""
+    if mode == "auto":
+        return rows > threshold
+    return mode == "webgl"
+
+
+def line_figure(x_column, y_column_1, xy_1, y_column_2=None, xy_2=None, x_range=(None, None), box_zoom=False, shapes=(), webgl=False):
+    """The main plot: y_column_1 against the left axis and, if xy_2 is given, y_column_2 against the right.
+
+    xy_1 and xy_2 are (x, y) arrays, already decimated for the view. With webgl
+    set both traces are Scattergl; the reference line shapes are drawn over
+    either kind of trace.
+    """
+    scatter = go.Scattergl if webgl else go.Scatter
+    fig = go.Figure(data=scatter(x=xy_1[0], y=xy_1[1], name=y_column_1, yaxis="y1"))
+    title = f"Plot of {y_column_1} vs {x_column}"
+
+    if xy_2 is not None:
+        fig.add_trace(scatter(x=xy_2[0], y=xy_2[1], name=y_column_2, yaxis="y2"))
+        title = f"Plot of {y_column_1} and {y_column_2} vs {x_column}"
+
+    # Second Y-axis on the right side
+    fig.update_layout(
+        template="plotly_dark",
+        title=title,
+        autosize=True,  # plot auto-resize
+        height=None,  # height determined by the container
+        yaxis=dict(title=y_column_1, side="left", fixedrange=box_zoom),
+        yaxis2=dict(
+            title=y_column_2,
+            side="right",
+            overlaying="y",  # Overlay on the same x-axis
+            position=1,  # Position the second Y-axis on the right
+        ),
+        xaxis=dict(
+            title=x_column,
+            range=list(x_range),
+            rangeslider=dict(visible=True),
+        ),
+        shapes=list(shapes),
+    )
+    return fig
+
+
+def static_figure(fig, x_range=None, y_range=None):
+    """A copy of fig with any Scattergl traces redrawn as Scatter, for image export.
+
+    Headless image renderers may have no GPU, so WebGL traces can come out
+    blank or differ from the screen; SVG renders the same everywhere.
+    x_range and y_range, if given, fix the copy's axis ranges; fig is left as it is.
+    """
+    data = []
+    for trace in fig.data:
+        if trace.type == "scattergl":
+            props = trace.to_plotly_json()
+            props.pop("type")
+            trace = go.Scatter(props, skip_invalid=True)
+        data.append(trace)
+    static = go.Figure(data=data, layout=fig.layout)
+    if x_range is not None:
+        static.update_layout(xaxis=dict(range=x_range))
+    if y_range is not None:
+        static.update_layout(yaxis=dict(range=y_range))
+    return static
+
+
+def histogram_bar(column, counts, edges):
+    """A pre-binned histogram trace: one bar per bin, spanning its edges."""
+    return go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        name=f"Histogram of {column}",
+        opacity=0.7,
+    )
+
+
+def histogram_figure(bars, y_column_1, y_column_2=None):
+    """Overlaid histogram bars for one or two columns."""
+    title = f"Histogram of {y_column_1}"
+    if y_column_2 is not None:
+        title += f" and {y_column_2}"
+
+    fig = go.Figure(bars)
+    fig.update_layout(
+        template="plotly_dark",
+        title=title,
+        xaxis_title="Y Values",
+        yaxis_title="Frequency",
+        barmode="overlay",  # Overlay histograms
+        bargap=0,
+        autosize=True,
+    )
+    return fig
+
+
+def overlay_figure(traces, x_column, column):
+    """The same column from several runs, one line each, on a shared x axis.
+
+    traces is a list of (name, x, y).
+    """
+    fig = go.Figure([go.Scatter(x=x, y=y, name=name, mode="lines") for name, x, y in traces])
+    fig.update_layout(
+        template="plotly_dark",
+        title=f"{column} vs {x_column} across {len(traces)} runs",
+        autosize=True,
+        height=None,
+        hovermode="x unified",  # runs share grid x values, so one hover shows every run
+        yaxis=dict(title=column),
+        xaxis=dict(title=x_column, rangeslider=dict(visible=True)),
+    )
+    return fig
@@ -0,0 +1,162 @@
+import numpy as np
+
+
+# Resolution of the cached base histogram. The bins that are drawn are sums of
+# runs of these, so changing the bin count or rule doesn't rescan the column.
+BASE_BINS = 4096
+
+DEFAULT_BINS = 50
+
+BIN_RULES = ["Freedman-Diaconis", "Sturges", "Fixed count"]
+
+
+class ColumnHistogram:
+    """Fine equal-width counts of a column, from which coarser histograms are derived.
+
+    The column is binned once into base_bins bins over its [min, max] range.
+    Quantiles for the Freedman-Diaconis rule are interpolated from the same
+    counts, and any coarser binning is a sum over groups of adjacent base bins.
+    NaN and infinite values are left out.
+
+    Exact zeros are counted separately so the zero filter can take them out of
+    the bin holding zero without rebinning the column.
+    """
+
+    def __init__(self, data, base_bins=BASE_BINS) -> None:
+        data = np.asarray(data)
+        lo, hi = (np.nanmin(data), np.nanmax(data)) if len(data) else (0.0, 0.0)
+        if not (np.isfinite(lo) and np.isfinite(hi)):
+            data = data[np.isfinite(data)]
+            lo, hi = (data.min(), data.max()) if len(data) else (0.0, 0.0)
+        if lo == hi:
+            lo, hi = lo - 0.5, hi + 0.5
+
+        counts, edges = np.histogram(data, bins=base_bins, range=(float(lo), float(hi)))
+        self._set_counts(counts, edges, len(data) - np.count_nonzero(data))
+
+    @classmethod
+    def from_counts(cls, counts, edges, zeros=0):
+        """A ColumnHistogram over base counts accumulated elsewhere, e.g. by a StreamingHistogram."""
+        histogram = cls.__new__(cls)
+        histogram._set_counts(np.asarray(counts), np.asarray(edges), zeros)
+        return histogram
+
+    def _set_counts(self, counts, edges, zeros):
+        self.counts, self.edges = counts, edges
+        self.zeros = int(zeros)
+        self.zero_bin = None
+        if self.zeros:
+            # Same bin np.histogram puts zero in, including the closed last bin
+            self.zero_bin = min(int(np.searchsorted(self.edges, 0, side="right")) - 1, len(counts) - 1)
+        self.nonzero_counts = self.counts.copy()
+        if self.zero_bin is not None:
+            self.nonzero_counts[self.zero_bin] -= self.zeros
+
+    def base_counts(self, drop_zeros=False):
+        """The cached base bin counts, with or without the exact zeros."""
+        return self.nonzero_counts if drop_zeros else self.counts
+
+    def quantile(self, q, drop_zeros=False):
+        """Approximate quantile, interpolated linearly within a base bin."""
+        counts = self.base_counts(drop_zeros)
+        cumulative = np.cumsum(counts)
+        if cumulative[-1] == 0:
+            return np.nan
+        target = q * cumulative[-1]
+        i = min(int(np.searchsorted(cumulative, target)), len(counts) - 1)
+        before = cumulative[i] - counts[i]
+        frac = (target - before) / counts[i] if counts[i] else 0.0
+        return self.edges[i] + frac * (self.edges[i + 1] - self.edges[i])
+
+    def bin_count(self, rule, bins=DEFAULT_BINS, drop_zeros=False):
+        """Number of bins the given rule asks for, capped at the base resolution."""
+        n = max(int(self.base_counts(drop_zeros).sum()), 1)
+        if rule == "Sturges":
+            count = np.ceil(np.log2(n)) + 1
+        elif rule == "Freedman-Diaconis":
+            # An IQR inside a single base bin can't be resolved, so treat it as zero
+            iqr = self.quantile(0.75, drop_zeros) - self.quantile(0.25, drop_zeros)
+            if iqr > self.edges[1] - self.edges[0]:
+                count = np.ceil((self.edges[-1] - self.edges[0]) * np.cbrt(n) / (2 * iqr))
+            else:
+                count = np.ceil(np.log2(n)) + 1
+        else:
+            count = bins
+        return int(min(max(count, 1), len(self.counts)))
+
+    def bins(self, rule, bins=DEFAULT_BINS, drop_zeros=False):
+        """Counts and edges for the given rule, merged from the base bins."""
+        # Spread the base bins as evenly as they divide; whole-size groups would give too few bins
+        count = self.bin_count(rule, bins, drop_zeros)
+        starts = np.unique(np.round(np.linspace(0, len(self.counts), count + 1)).astype(int))[:-1]
+        counts = np.add.reduceat(self.base_counts(drop_zeros), starts)
+        edges = np.append(self.edges[starts], self.edges[-1])
+        return counts, edges
+
+
+class StreamingHistogram:
+    """Equal-width counts accumulated chunk by chunk over a range that grows to fit.
+
+    The range starts as the first chunk's. When a value falls outside it the
+    bin width doubles, with adjacent pairs of bins merged, so memory stays at
+    base_bins counts and at least half of them end up spanning the data.
+    NaN and infinite values are left out. histogram() gives a ColumnHistogram
+    over the result, so the same bin rules and zero filter apply.
+    """
+
+    def __init__(self, base_bins=BASE_BINS) -> None:
+        self.base_bins = base_bins
+        self.counts = np.zeros(base_bins, dtype=np.int64)
+        self.lo = None
+        self.width = None
+        self.zeros = 0
+
+    def update(self, chunk):
+        """Count a chunk of values."""
+        chunk = np.asarray(chunk)
+        if chunk.dtype.kind == "f":
+            chunk = chunk[np.isfinite(chunk)]
+        if len(chunk) == 0:
+            return
+        self.zeros += len(chunk) - np.count_nonzero(chunk)
+        self._add(chunk)
+
+    def merge(self, other):
+        """Add another StreamingHistogram's counts, placing each of its bins at its centre."""
+        if other.lo is None:
+            return
+        filled = np.flatnonzero(other.counts)
+        centres = other.lo + (filled + 0.5) * other.width
+        self.zeros += other.zeros
+        self._add(centres, other.counts[filled])
+
+    def _add(self, values, weights=None):
+        vmin, vmax = float(values.min()), float(values.max())
+        if self.lo is None:
+            self.lo = vmin
+            span = vmax - vmin
+            self.width = span / self.base_bins if span > 0 else max(abs(vmin), 1.0) / self.base_bins
+
+        half = self.base_bins // 2
+        while vmax > self.lo + self.width * self.base_bins:
+            # Grow to the right: old bins pair up into the lower half
+            self.counts = np.concatenate([self.counts.reshape(-1, 2).sum(axis=1), np.zeros(half, np.int64)])
+            self.width *= 2
+        while vmin < self.lo:
+            # Grow to the left: old bins pair up into the upper half
+            self.counts = np.concatenate([np.zeros(half, np.int64), self.counts.reshape(-1, 2).sum(axis=1)])
+            self.lo -= self.width * self.base_bins
+            self.width *= 2
+
+        bins = np.clip(((values - self.lo) / self.width).astype(np.int64), 0, self.base_bins - 1)
+        counts = np.bincount(bins, weights=weights, minlength=self.base_bins)
+        self.counts += np.rint(counts).astype(np.int64) if weights is not None else counts
+
+    def histogram(self):
+        """The counts so far as a ColumnHistogram, trimmed to the bins the data spans."""
+        filled = np.flatnonzero(self.counts)
+        if len(filled) == 0:
+            return ColumnHistogram.from_counts(np.zeros(1, np.int64), np.array([-0.5, 0.5]))
+        first, last = filled[0], filled[-1] + 1
+        edges = self.lo + self.width * np.arange(first, last + 1)
+        return ColumnHistogram.from_counts(self.counts[first:last], edges, self.zeros)
@@ -0,0 +1,419 @@
+import io
+import json
+import os
+import threading
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+
+NUMERIC_DTYPES = [pl.Float64, pl.Int64, pl.Float32, pl.Int32]
+
+# Float columns are checked on this many rows before all of them, so most that can't be narrowed are rejected quickly
+SAMPLE_ROWS = 10_000
+
+# Narrower integer types and their widths in bits, smallest first, tried when compacting a loaded column
+INT_DTYPES = [(pl.Int8, 8), (pl.Int16, 16), (pl.Int32, 32)]
+
+# Text is parsed this many bytes at a time so loads can report progress and be cancelled
+CHUNK_BYTES = 64 * 1024 * 1024
+
+# Rows per batch when streaming a cached (Arrow IPC) file
+BATCH_ROWS = 1 << 20
+
+# Bytes read at a time when looking back from the end of a followed file for its last line
+TAIL_BYTES = 64 * 1024
+
+
+class LoadCancelled(Exception):
+    """Raised inside a load when its cancel event has been set."""
+
+
+def prints_as_float32(series):
+    """True if every value of a float column reads back the same after a trip through Float32 and text.
+
+    The simulator writes a limited number of digits, so a value like 12.345
+    is kept exactly, as the file has it, by the nearest Float32.
+    """
+    return series.cast(pl.Float32).cast(pl.String).cast(pl.Float64).equals(series)
+
+
+def compact_series(series):
+    """series in the narrowest dtype that holds every value exactly, or series itself.
+
+    Whole-number columns (flags, counters, gear) become Int8/16/32, and float
+    columns whose values are all written with at most Float32's precision
+    become Float32. Columns with nulls are left alone, since numpy would need
+    a float copy of them anyway.
+    """
+    if series.dtype not in NUMERIC_DTYPES or series.len() == 0 or series.null_count():
+        return series
+
+    if series.dtype.is_float() and series.is_finite().all() and (series == series.floor()).all():
+        whole = True
+    else:
+        whole = series.dtype.is_integer()
+    if whole:
+        low, high = series.min(), series.max()
+        for dtype, bits in INT_DTYPES:
+            if -(2 ** (bits - 1)) <= low and high < 2 ** (bits - 1):
+                return series.cast(dtype)
+        return series
+
+    if series.dtype == pl.Float64 and prints_as_float32(series.head(SAMPLE_ROWS)) and prints_as_float32(series):
+        return series.cast(pl.Float32)
+    return series
+
+
+def extend_series(stored, new):
+    """stored with the rows of new added, kept in stored's dtype if new fits it exactly.
+
+    Adds a chunk rather than copying, so each call costs only the new rows.
+    """
+    if stored.dtype != new.dtype:
+        narrowed = new.cast(stored.dtype, strict=False)
+        if stored.dtype == pl.Float32:
+            # Checked the way compact_series chose Float32, by the values as the file writes them
+            fits = prints_as_float32(new)
+        else:
+            fits = narrowed.equals(new, check_dtypes=False)
+        if fits:
+            new = narrowed
+        elif stored.dtype == pl.Float32:
+            # Back to the file's dtype through text, so the stored rows get their written values
+            # again rather than their nearest Float32 (12.345, not 12.345000267)
+            stored = stored.cast(pl.String).cast(new.dtype)
+        else:
+            # The new rows don't fit the compacted dtype, so go back to the file's
+            stored = stored.cast(new.dtype)
+    return stored.append(new)
+
+
+def iter_text_columns(source, schema, columns, progress=None, cancel=None, chunk_bytes=CHUNK_BYTES, end=None):
+    """Parse the given columns of a space-separated .dat file, yielding one DataFrame per chunk.
+
+    progress(bytes_done, bytes_total) is called after each chunk, and a set
+    cancel event (threading.Event) stops the read with LoadCancelled.
+    If end is given, only the bytes before that offset are read.
+    """
+    if isinstance(source, (str, Path)):
+        stream = open(source, "rb")
+        total = os.path.getsize(source)
+    else:
+        stream = io.BytesIO(source)
+        total = len(source)
+    if end is not None:
+        total = min(total, end)
+
+    indices = [schema.names().index(column) for column in columns]
+    with stream:
+        done = len(stream.readline())  # header, already known from the schema
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise LoadCancelled()
+
+            block = stream.read(min(chunk_bytes, total - done))
+            if not block:
+                break
+
+            # Only parse whole lines; rewind so the partial last line starts the next block
+            cut = block.rfind(b"\n") + 1
+            if 0 < cut < len(block):
+                stream.seek(cut - len(block), os.SEEK_CUR)
+                block = block[:cut]
+
+            frame = pl.read_csv(block, separator=" ", has_header=False, schema=schema, columns=indices)
+
+            done += len(block)
+            if progress is not None:
+                progress(done, total)
+            yield frame
+
+
+def read_text_columns(source, schema, columns, progress=None, cancel=None, chunk_bytes=CHUNK_BYTES, end=None):
+    """Parse the given columns of a space-separated .dat file in chunks, as in iter_text_columns."""
+    frames = list(iter_text_columns(source, schema, columns, progress, cancel, chunk_bytes, end))
+    if not frames:
+        return pl.DataFrame(schema={column: schema[column] for column in columns})
+    return pl.concat(frames, rechunk=True)
+
+
+class DatFile:
+    """A space-separated .dat file whose columns are parsed on demand.
+
+    Only the header is read when the file is opened. Columns are parsed with a
+    projected read the first time they are asked for, so memory grows with the
+    columns actually plotted rather than with the file width.
+    With lazy=False the whole file is read up front, as before.
+
+    With compact set, loaded columns are stored in the narrowest dtype that
+    holds them exactly (see compact_series), and array() hands out one shared
+    read-only numpy view of each, so redraws don't copy columns. With a cache,
+    the dtype chosen for each column is kept in a sidecar of the file's entry,
+    so reopening the same file casts straight to it instead of checking again.
+
+    If a FileCache is given, a cached Arrow IPC copy of the file is memory-mapped
+    in place of the text, and files that aren't cached yet are converted in the
+    background for next time. With store=False an existing copy is used but no
+    conversion is started, for files only read in passing.
+
+    Reads accept progress and cancel arguments as described in read_text_columns,
+    so they can run on a worker thread behind a progress indicator.
+    """
+
+    def __init__(self, source, lazy=True, cache=None, progress=None, cancel=None, compact=True, store=True) -> None:
+        # Uploads arrive as file objects; read them once so every scan sees the same bytes
+        if hasattr(source, "read"):
+            source.seek(0)
+            source = source.read()
+
+        self.source = source
+        self.lazy = lazy
+        self.compact = compact
+        self._series: dict = {}
+        self._arrays: dict = {}  # column -> read-only numpy view handed out by array()
+        self.end = None  # byte offset the loaded rows stop at while following, see follow()
+        self._lock = threading.Lock()  # orders storing a newly loaded column against append()
+
+        is_path = isinstance(source, (str, Path))
+        self.cached = cache.lookup(source) if cache is not None and is_path else None
+        store = store and cache is not None and is_path and self.cached is None
+        # column -> compacted dtype name, shared by every open of this version of the file
+        self._dtypes_path = None
+        if self.cached is not None or store:
+            self._dtypes_path = cache.sidecar_path(source, "dtypes")
+        self._dtypes = self._read_dtypes()
+        if self.cached is not None:
+            self.scan = pl.scan_ipc(self.cached, memory_map=True)
+        else:
+            self.scan = pl.scan_csv(source, separator=" ", has_header=True)
+        self.schema = self.scan.collect_schema()
+        self.columns = self.schema.names()
+
+        if not lazy:
+            self.load(self.columns, progress=progress, cancel=cancel)
+
+        if store:
+            cache.store_in_background(source, self.scan)
+
+    def numeric_columns(self):
+        """Names of the int and float columns, in file order."""
+        return [col for col, dtype in self.schema.items() if dtype in NUMERIC_DTYPES]
+
+    def is_loaded(self, columns):
+        """True if every known column in columns has already been read."""
+        return all(col in self._series for col in columns if col in self.schema)
+
+    def load(self, columns, progress=None, cancel=None):
+        """Materialize any of the given columns that haven't been read yet, in one pass."""
+        missing = [col for col in dict.fromkeys(columns) if col in self.schema and col not in self._series]
+        if not missing:
+            return
+
+        logger.info(f"Reading columns {missing}")
+        end = self.end
+        if self.cached is not None:
+            # Memory-mapped, so there is nothing worth reporting progress on
+            if cancel is not None and cancel.is_set():
+                raise LoadCancelled()
+            frame = self.scan.select(missing).collect()
+        else:
+            frame = read_text_columns(self.source, self.schema, missing, progress, cancel, end=end)
+
+        # Compacted before taking the lock, so append() on the event loop never waits for it
+        series = {column: self._compacted(frame[column]) if self.compact else frame[column] for column in missing}
+        self._write_dtypes()
+        with self._lock:
+            if self.cached is None and self.end != end:
+                # Rows were appended while this read ran; read them too so every column has the same rows
+                gap = self._read_lines(missing, end, self.end)
+                for column in missing:
+                    series[column] = extend_series(series[column], gap[column])
+            self._series.update(series)
+        logger.debug(f"Loaded columns use {self.nbytes() / 1e6:.1f} MB")
+
+    def _compacted(self, series):
+        """compact_series(series), or series cast to the dtype recorded for it on an earlier open."""
+        name = self._dtypes.get(series.name)
+        if name is not None:
+            try:
+                return series.cast(getattr(pl, name))
+            except (AttributeError, pl.exceptions.PolarsError):
+                logger.warning(f"Recorded dtype {name} no longer fits column {series.name}")
+        compacted = compact_series(series)
+        self._dtypes[series.name] = str(compacted.dtype)
+        return compacted
+
+    def _read_dtypes(self):
+        if self._dtypes_path is None:
+            return {}
+        try:
+            with open(self._dtypes_path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_dtypes(self):
+        """Save the recorded dtypes next to the cache entry, replacing the file atomically."""
+        if self._dtypes_path is None or not self._dtypes:
+            return
+        temp = self._dtypes_path.with_suffix(".tmp")
+        try:
+            with open(temp, "w") as file:
+                json.dump(self._dtypes, file)
+            os.replace(temp, self._dtypes_path)
+        except OSError as ex:
+            logger.warning(f"Could not save column dtypes: {ex}")
+
+    def array(self, column):
+        """The column as a read-only numpy array, shared by every caller.
+
+        Built once per column and kept; a view of the column's own buffer
+        when it is one chunk with no nulls, which is how loads store it.
+        Rechunking happens outside the lock, as compaction does in load(), and
+        is redone if append() extended the column meanwhile.
+        """
+        while True:
+            with self._lock:
+                if column in self._arrays:
+                    return self._arrays[column]
+                series = self._series.get(column)
+            if series is None:
+                series = self[column]  # loads it, or raises KeyError for a column the file doesn't have
+            rechunked = series.rechunk() if series.n_chunks() > 1 else series
+            array = rechunked.to_numpy()
+            array.setflags(write=False)
+            with self._lock:
+                if self._series.get(column) is series:
+                    self._series[column] = rechunked
+                    self._arrays[column] = array
+                    return array
+
+    def nbytes(self):
+        """Memory held by the loaded columns."""
+        return sum(series.estimated_size() for series in self._series.values())
+
+    def follow(self, progress=None, cancel=None):
+        """Start reading a file that is still being written, see read_appended.
+
+        The loaded columns are re-read up to the last complete line and
+        columns loaded later stop there too, so every column has the same
+        rows. Any cached copy is set aside since the file has moved on from it.
+        Returns the byte offset reading stopped at.
+        """
+        with open(self.source, "rb") as stream:
+            end = stream.seek(0, os.SEEK_END)
+            # Back up to just after the last newline, skipping a line still being written
+            while end > 0:
+                start = max(end - TAIL_BYTES, 0)
+                stream.seek(start)
+                cut = stream.read(end - start).rfind(b"\n")
+                if cut >= 0:
+                    end = start + cut + 1
+                    break
+                end = start
+
+        with self._lock:
+            if self.cached is not None:
+                self.cached = None
+                self.scan = pl.scan_csv(self.source, separator=" ", has_header=True)
+            # Rows beyond the recorded version of the file may not fit the dtypes recorded for it
+            self._dtypes_path = None
+            self._dtypes = {}
+            self.end = end
+            loaded, self._series, self._arrays = list(self._series), {}, {}
+        self.load(loaded, progress=progress, cancel=cancel)
+        return end
+
+    def read_appended(self):
+        """Parse the complete lines written since the last read, for the loaded columns.
+
+        Only the new bytes are read, so the cost depends on how much was
+        written rather than on the file size. Returns the new rows as a
+        DataFrame (possibly empty) and the offset they end at; pass both to
+        append() to add them. Safe to call from a worker thread.
+        """
+        columns = list(self._series)
+        with open(self.source, "rb") as stream:
+            size = stream.seek(0, os.SEEK_END)
+            if size < self.end:
+                raise ValueError(f"{self.source} was truncated while being followed")
+            stream.seek(self.end)
+            block = stream.read(size - self.end)
+
+        cut = block.rfind(b"\n") + 1
+        return self._parse_lines(columns, block[:cut]), self.end + cut
+
+    def _read_lines(self, columns, start, stop):
+        """Parse the given columns from the whole lines between byte offsets start and stop."""
+        with open(self.source, "rb") as stream:
+            stream.seek(start)
+            return self._parse_lines(columns, stream.read(stop - start))
+
+    def _parse_lines(self, columns, block):
+        if not block or not columns:
+            return pl.DataFrame(schema={column: self.schema[column] for column in columns})
+        indices = [self.columns.index(column) for column in columns]
+        return pl.read_csv(block, separator=" ", has_header=False, schema=self.schema, columns=indices)
+
+    def append(self, frame, end):
+        """Add rows from read_appended to the loaded columns.
+
+        Returns False, leaving everything as it was, if a column was loaded
+        after the rows were read; the next read_appended picks them up again.
+        """
+        with self._lock:
+            return self._append(frame, end)
+
+    def _append(self, frame, end):
+        if any(column not in frame.columns for column in self._series):
+            return False
+        for column in list(self._series):
+            self._series[column] = extend_series(self._series[column], frame[column])
+            self._arrays.pop(column, None)
+        self.end = end
+        return True
+
+    def estimated_rows(self):
+        """Row count, exact for cached files and estimated from the first chunk's line length otherwise."""
+        if self.cached is not None:
+            return self.scan.select(pl.len()).collect().item()
+        if isinstance(self.source, (str, Path)):
+            with open(self.source, "rb") as stream:
+                total = os.path.getsize(self.source)
+                stream.readline()
+                sample = stream.read(1024 * 1024)
+        else:
+            total = len(self.source)
+            sample = self.source[self.source.find(b"\n") + 1 :][: 1024 * 1024]
+        lines = sample.count(b"\n")
+        return int(total * lines / len(sample)) if lines else 1
+
+    def iter_batches(self, columns, progress=None, cancel=None):
+        """Yield the given columns as a series of DataFrames, without keeping them.
+
+        Lets files too large for memory be processed batch by batch.
+        progress and cancel work as in read_text_columns.
+        """
+        if self.cached is None:
+            yield from iter_text_columns(self.source, self.schema, columns, progress, cancel)
+            return
+
+        total = self.estimated_rows()
+        for offset in range(0, total, BATCH_ROWS):
+            if cancel is not None and cancel.is_set():
+                raise LoadCancelled()
+            # Memory-mapped, so each batch only pages in its own rows
+            frame = self.scan.select(columns).slice(offset, BATCH_ROWS).collect()
+            if progress is not None:
+                progress(offset + frame.height, total)
+            yield frame
+
+    def __getitem__(self, column) -> pl.Series:
+        if column not in self._series:
+            self.load([column])
+        return self._series[column]
+
+    def __contains__(self, column):
+        return column in self.schema
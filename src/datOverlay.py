@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from datAxis import XAxisIndex
+from datDecimate import DEFAULT_MAX_POINTS, minmax_decimate, minmax_indices
+from datLoader import DatFile, LoadCancelled
+from datResample import Resampler
+
+
+# Cap on the shared grid; ten runs resampled onto it still fit comfortably in memory
+MAX_GRID_POINTS = 2_000_000
+
+# Files read at once; polars parses outside the GIL so threads overlap well
+LOAD_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def common_columns(paths):
+    """Numeric columns present in every file, in the first file's order.
+
+    Only the headers are read, so the file cache is left out: opening an
+    uncached file through it would start a full background conversion.
+    """
+    with ThreadPoolExecutor(LOAD_WORKERS) as pool:
+        files = list(pool.map(DatFile, paths))
+    shared = set.intersection(*(set(dat_file.numeric_columns()) for dat_file in files))
+    return [column for column in files[0].numeric_columns() if column in shared]
+
+
+def load_runs(paths, x_column, column, cache=None, progress=None, cancel=None):
+    """Read x_column and column from each file, several files at a time.
+
+    Only those two columns are parsed, through the same DatFile projection as
+    the main plot. A cached copy is used if the file has one, but none is
+    written: converting every compared file in the background would parse
+    each in full alongside this read. Returns a list of (name, x, y) with x sorted.
+    progress and cancel work as in read_text_columns, summed over all files.
+    """
+    sizes = {path: os.path.getsize(path) for path in paths}
+    total = sum(sizes.values())
+    done = dict.fromkeys(paths, 0)
+
+    def load(path):
+        if cancel is not None and cancel.is_set():
+            raise LoadCancelled()
+
+        def file_progress(file_done, file_total):
+            done[path] = file_done
+            if progress is not None:
+                progress(sum(done.values()), total)
+
+        dat_file = DatFile(path, cache=cache, store=False)
+        dat_file.load([x_column, column], progress=file_progress, cancel=cancel)
+        file_progress(sizes[path], sizes[path])
+
+        x_index = XAxisIndex(dat_file.array(x_column))
+        y = dat_file.array(column)
+        if not x_index.is_sorted:
+            y = y[x_index.order]
+        return Path(path).stem, x_index.sorted_x, y
+
+    with ThreadPoolExecutor(LOAD_WORKERS) as pool:
+        return list(pool.map(load, paths))
+
+
+def grid_rate(xs, max_points=MAX_GRID_POINTS, rate=None):
+    """Rate of the shared grid: rate, or else that of the most finely sampled run.
+
+    Lowered by a whole factor if a grid over every run would pass max_points,
+    so its points stay on the finer grid's x values. None if no run spans any x.
+    """
+    xs = [x for x in xs if len(x) > 1 and x[-1] > x[0]]
+    if not xs:
+        return None
+    if not rate:
+        rate = max((len(x) - 1) / (x[-1] - x[0]) for x in xs)
+    span = max(x[-1] for x in xs) - min(x[0] for x in xs)
+    points = int(span * rate) + 1
+    if points > max_points:
+        rate /= int(np.ceil(points / max_points))
+    return rate
+
+
+def overlay_traces(runs, max_points=DEFAULT_MAX_POINTS, rate=None, method="interpolate", origin=None):
+    """Resample every run onto one shared grid, then decimate them together for plotting.
+
+    Each run goes through a Resampler, with the same methods and dropout
+    handling as the main plot, and the grid is anchored at origin, the main
+    plot's grid start, when given. Decimation keeps every run's min and max
+    per bucket, then samples all runs at the union of those grid points, so
+    hover and comparisons still line up exactly across files. Returns a list
+    of (name, x, y).
+    """
+    runs = [(name, x, y) for name, x, y in runs if len(x)]
+    rate = grid_rate([x for _, x, _ in runs], rate=rate)
+    if rate is None:
+        return [(name, *minmax_decimate(x, y, max_points)) for name, x, y in runs]
+    if origin is None:
+        origin = min(x[0] for _, x, _ in runs)
+
+    gridded = []
+    for name, x, y in runs:
+        # The grid's size was checked by grid_rate, so no run lowers the rate on its own
+        resampler = Resampler(x, rate, method, max_points=2 * MAX_GRID_POINTS, origin=origin)
+        # Grid points as whole steps from origin, which compare exactly across runs
+        steps = np.round((resampler.grid - origin) * rate).astype(np.int64)
+        gridded.append((name, steps, resampler.grid, resampler.resample(y)))
+
+    budget = max(max_points // len(gridded), 2)
+    keep = np.unique(np.concatenate([steps[minmax_indices(y, budget)] for _, steps, _, y in gridded]))
+    traces = []
+    for name, steps, grid, y in gridded:
+        chosen = np.isin(steps, keep, assume_unique=True)
+        traces.append((name, grid[chosen], y[chosen]))
+    return traces
@@ -1,9 +1,12 @@
-from nicegui import ui, app
+from nicegui import ui, app, run, background_tasks
 from nicegui.events import UploadEventArguments
+import asyncio
+import math
 import os
-import polars as pl
+import threading
 import numpy as np
 import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
 from loguru import logger
 from datetime import datetime
 from appdirs import AppDirs
@@ -12,24 +15,94 @@ from pathlib import Path
 
 import webview
 
+from datAxis import XAxisIndex
+from datCache import DEFAULT_MAX_MB, FileCache, LRUCache
+from datDecimate import DEFAULT_MAX_POINTS, decimate_window, minmax_decimate, minmax_indices
+from datFigures import (
+    RENDER_MODES, WEBGL_ABOVE_ROWS, histogram_bar, histogram_figure, line_figure, overlay_figure, static_figure,
+    use_webgl,
+)
+from datHistogram import BASE_BINS, BIN_RULES, DEFAULT_BINS, ColumnHistogram
+from datLoader import DatFile, LoadCancelled
+from datOverlay import common_columns, load_runs, overlay_traces
+from datProfile import SORT_ORDERS, FileProfile, profile_columns
+from datPyramid import ColumnPyramid
+from datRender import ImageRenderer
+from datResample import RESAMPLE_METHODS, Resampler
+from datStats import fused_stats, median
+from datStream import ColumnSummary, summarize
+from datTrace import traced, tracer
+from datTransport import DECODE_SCRIPT, compact_array, encode_arrays
+
+
+# Seconds a zoom or pan has to settle before the view is refilled and zoom stats recomputed
+RELAYOUT_DEBOUNCE = 0.15
+
+# Seconds between checks for rows appended to a followed file; also caps how often the plot is pushed
+TAIL_INTERVAL = 1.0
+
+# Files larger than this (MB) are summarized batch by batch instead of loaded, see summarize
+STREAM_ABOVE_MB = 2048
 
 # Make summary look better
 # Make executable? - most modern solution
 # Copy to clipboard
 
 
+class LivePlot(ui.plotly):
+    """A ui.plotly that is changed in place by plotly.js calls rather than resent whole."""
+
+    def sync_figure(self):
+        """Store the current figure as the element's state, without sending it to the client.
+
+        The browser already has the changes from the plotly.js calls; this keeps
+        the stored copy current for when the client renders the element again.
+        """
+        self._props["options"] = self._get_figure_json()
+
+
 class MainDataPage:
     def __init__(self) -> None:
         """The page is created as soon as the class is instantiated."""
         self.dat_file_data = None  # store dat file data
+        self.stream_summary = None  # StreamSummary of a file too large to load, else None
+        self.column_profile = None  # FileProfile of the open file once it has been profiled
+        self.profile_cancel = None  # threading.Event stopping the background profile of the previous file
+        self.following = False  # reading rows appended to the open file, see start_follow
+        self.tail_busy = False  # a read of appended rows is in flight
+        self.tail_stale = False  # rows were appended since x_index and y_data were last taken
+        self.tail_summaries: dict = {}  # column -> ColumnSummary kept current while following
+        self.column_generation = 0  # bumped when the column caches are dropped; older worker results are discarded
+        self.summary_generation = 0  # bumped per summary stats update, like zoom_generation
+        self.tail_x_range = None  # x range last pushed to the plot by a follow update
         self.original_min_max = None  # store the original full range for resetting
         self.filter_zeros = None  # filter out 0 val for histogram
         self.plot_figure = None
         self.plot = None
+        self.plotted_columns = None  # (x, y1, y2, settings...) whose traces the live plot holds
+        self.plot_state = None  # zoom and layout settings last sent to the live plot
+        self.histogram_key = None  # inputs the histogram was last drawn from, see histogram_inputs
         self.range_start = None
         self.range_end = None
         self.isZoomed = False
         self.quickUpload = False
+        self.max_plot_points = DEFAULT_MAX_POINTS  # points per trace sent to the browser
+        self.pyramids: dict = {}  # series_key -> ColumnPyramid, built on first plot
+        self.nonzero_masks: dict = {}  # series_key -> boolean mask of its nonzero rows
+        self.x_indexes: dict = {}  # series_key of an x column -> XAxisIndex
+        self.resamplers: dict = {}  # (x column, rate, method) -> Resampler
+        self.x_index = None
+        self.x_range_indices = slice(None)  # rows inside the zoomed x range
+        self.zoom_generation = 0  # bumped per zoom update; results from older ones are dropped
+        self.zoom_redecimate = False  # the x range changed and the traces haven't caught up yet
+        self.load_cancel = None  # threading.Event of the load in flight
+        self.stats_cache = LRUCache()  # summary/zoom stats, see stats_key
+        self.trace_cache = LRUCache()  # decimated (x, y) plot traces
+        self.histogram_cache = LRUCache()  # ColumnHistogram base counts per column
+        self.load_status = {"done": 0, "total": 0, "label": ""}
+        self.renderer = ImageRenderer()  # kaleido browser kept warm between image saves
+        self.compare_paths: list = []  # files overlaid in the Compare tab
+        self.compare_figure = None
 
         self.x_list = ["SimTime", "DatTime", "MediaTime"]
         self.largeList = ["SimTime", "DatTime", "MediaTime", "XPos", "Velocity"]
@@ -39,6 +112,8 @@ class MainDataPage:
         self.config_dir = Path(
             AppDirs("DatPlot", "DSL").user_config_dir)
         self.config_filepath = self.config_dir / Path("config.toml")
+        self.cache_dir = Path(AppDirs("DatPlot", "DSL").user_cache_dir)
+        self.file_cache = None  # converted copies of opened files, set up with the config
 
         self.gui_components: dict = {
             "graph_dropdown": None,
@@ -53,7 +128,10 @@ class MainDataPage:
             "saved file": "",
             "current tab": "",
             "zero button": "",
-            "summary_stats_container": None
+            "summary_stats_container": None,
+            "load_progress": None,
+            "compare_dropdown": None,
+            "compare_container": None
         }
 
         self.bindings = {
@@ -67,6 +145,9 @@ class MainDataPage:
 
     def page_creation(self):
 
+        # Lets Plotly calls carry trace arrays as base64 buffers, see run_plot_method
+        ui.add_head_html(DECODE_SCRIPT)
+
         # Create the main UI elements
         with ui.row(align_items="center").style("width:100%; display: flex;background-color:#1f1f1f; padding:10px;border-radius: 20px"):
             
@@ -113,7 +194,7 @@ class MainDataPage:
                     self.x_list,
                     value=self.x_list[0],  # Defaults to SimTime
                     label="Select X-axis",
-                    on_change=self.plot_selected_column,
+                    on_change=self.on_selection_change,
                 ).style("width:70%")
 
 
@@ -122,7 +203,7 @@ class MainDataPage:
                 ["Select Graph"],
                 value="Select Graph",
                 label="Select Y-axis 1",
-                on_change=self.plot_selected_column,  # column selection
+                on_change=self.on_selection_change,  # column selection
             ).style('flex:2;')
 
             ui.button(icon="compare_arrows", on_click=self.swap_y).style("width:2%").props("color=dark")
@@ -132,7 +213,7 @@ class MainDataPage:
                 ["Select Graph"],
                 value="Select Graph",
                 label="Select Y-axis 2 (optional)",
-                on_change=self.plot_selected_column,  # column selection
+                on_change=self.on_selection_change,  # column selection
             ).style('flex:2;')
 
             self.load_recents()
@@ -142,12 +223,30 @@ class MainDataPage:
             ui.label().classes("text-lg font-semibold mt-2").bind_text_from(
                 self.bindings, "current file", backward=lambda n: f"{Path(n).name}"
             )
+
+            # Progress of a file or column load running in the background
+            self.gui_components["load_progress"] = ui.row(align_items="center").classes("w-full")
+            with self.gui_components["load_progress"]:
+                self.load_progress_bar = ui.linear_progress(value=0, show_value=False).style("flex:1")
+                self.load_progress_label = ui.label()
+                ui.button("Cancel", icon="close", on_click=self.cancel_load).props("color=dark")
+            self.gui_components["load_progress"].visible = False
+            ui.timer(0.2, self.update_load_progress)
+
+            # Latency breakdown of the last interaction, shown while tracing is on
+            self.trace_overlay = ui.card().classes("fixed bottom-4 right-4 z-50").style(
+                "background-color:#1f1f1f; opacity:0.9; min-width:260px; pointer-events:none"
+            )
+            self.trace_overlay.visible = tracer.enabled
+            tracer.listeners.append(self.show_trace)
+            self.tail_timer = ui.timer(TAIL_INTERVAL, self.read_tail, active=False)
             # containers for plot1
             
             with ui.element('div').classes('w-full').style("padding:2px; border-radius: 10px; background-color:#161616"):
                 with ui.tabs(on_change=self.changeTabHandler).classes('w-full') as tabs:
                     one = ui.tab('Plot')
                     two = ui.tab('Histogram')
+                    three = ui.tab('Compare')
                     
                 with ui.tab_panels(tabs, value=one).classes('w-full').style("background-color:#161616"):
                     
@@ -174,6 +273,10 @@ class MainDataPage:
                                             .props("color=dark")
                                         )
 
+                                        with ui.switch("Follow", on_change=self.set_follow).style("flex:1;") as follow_switch:
+                                            ui.tooltip("Keep reading rows appended to the file, e.g. by a running simulator")
+                                        self.gui_components["follow_switch"] = follow_switch
+
                                         # Input for vertical line position
                                         self.gui_components["vertical_line_input"] = (
                                             ui.input("Vertical Line Pos (X)")
@@ -200,6 +303,46 @@ class MainDataPage:
 
                                         with ui.column():
                                             self.upload_component = ui.upload(on_upload=self.uploadNewFile, auto_upload=True, label='Drag and Drop a New Dat File', max_files=1).props("color=dark")
+
+                                    # Regrid the plotted columns onto a uniform time base
+                                    with ui.row(align_items="center").style("width:100%; display:flex;"):
+                                        ui.number(
+                                            "Resample rate (per x unit, 0 = raw)", value=self.config["resample"]["rate"], min=0, format="%g",
+                                            on_change=lambda e: self.set_resample_option("rate", e.value or 0),
+                                        ).props("dense debounce=500").style("flex:2;")
+                                        ui.select(
+                                            RESAMPLE_METHODS, label="Resample method", value=self.config["resample"]["method"],
+                                            on_change=lambda e: self.set_resample_option("method", e.value),
+                                        ).props("dense").style("flex:1;")
+
+                                    # SVG or WebGL traces; "auto" switches to WebGL for plots with many points
+                                    with ui.row(align_items="center").style("width:100%; display:flex;"):
+                                        ui.select(
+                                            RENDER_MODES, label="Rendering", value=self.config["plot"].get("render mode", "auto"),
+                                            on_change=lambda e: self.set_render_option("render mode", e.value),
+                                        ).props("dense").style("flex:1;")
+                                        ui.number(
+                                            "Auto: WebGL above rows in view",
+                                            value=self.config["plot"].get("webgl above rows", WEBGL_ABOVE_ROWS),
+                                            min=0, step=1000, format="%d",
+                                            on_change=lambda e: self.set_render_option("webgl above rows", int(e.value or 0)),
+                                        ).props("dense debounce=500").style("flex:2;")
+
+                                    # How the y-axis dropdowns list columns, using the background column profile
+                                    with ui.row(align_items="center").style("width:100%; display:flex;"):
+                                        ui.select(
+                                            SORT_ORDERS, label="Sort columns by", value=self.config["profile"]["sort by"],
+                                            on_change=lambda e: self.set_profile_option("sort by", e.value),
+                                        ).props("dense").style("flex:1;")
+                                        ui.switch(
+                                            "Hide constant columns", value=self.config["profile"]["hide constant"],
+                                            on_change=lambda e: self.set_profile_option("hide constant", e.value),
+                                        ).style("flex:1;")
+
+                                    # Where the time goes: per-interaction timings, and a trace file for offline analysis
+                                    with ui.row(align_items="center").style("width:100%; display:flex;"):
+                                        ui.switch("Timing overlay", value=self.config["debug"]["trace"], on_change=self.set_tracing)
+                                        ui.button("Save Trace", icon="timeline", on_click=self.save_trace).props("color=dark")
                             
                         self.gui_components["plot_container"] = ui.element("div").style(
                     "width: 100%; height: 650px;")  # Full width, dynamic height
@@ -232,17 +375,35 @@ class MainDataPage:
                     
                     with ui.tab_panel(two).style("border-radius: 10px; background-color:#161616"):
 
-                        def toggle_filter():
+                        async def toggle_filter():
                             self.gui_components["zero button"].props(f'color={"blue-10" if self.bindings['zero toggle'] else "dark"}')
 
                             self.bindings['zero toggle'] = not self.bindings['zero toggle']
-                            
-                            self.plot_histogram()  # Re-plot the histogram with the new filter state
+                            self.filter_zeros = not self.bindings['zero toggle']
+
+                            if self.dat_file_data is not None and self.bindings["graph rendered"]:
+                                # Bins are cached and masks are built off the event loop, so nothing is rescanned here
+                                await self.plot_histogram()  # Re-plot the histogram with the new filter state
+                                await self.update_summary_stats()
+                                if self.isZoomed:
+                                    await self.add_zoom_stats()
                             #ui.notify(f"Filtering Zeros: {'ON' if self.filter_zeros else 'OFF'}")
 
                         with ui.row():
                             #ui.button("Save Histogram as JPG", on_click=self.save_histogram_as_jpg, icon="save")
                             self.gui_components["zero button"] = ui.button("Toggle Zero Filter", on_click=toggle_filter).props("color=dark")
+                            ui.select(
+                                BIN_RULES, label="Bins", value=self.config["histogram"]["bin rule"],
+                                on_change=lambda e: self.set_histogram_option("bin rule", e.value),
+                            ).props("dense").style("min-width: 180px")
+                            ui.number(
+                                "Bin count", value=self.config["histogram"]["bins"], min=1, max=BASE_BINS, step=10, format="%d",
+                                on_change=lambda e: self.set_histogram_option(
+                                    "bins", min(max(int(e.value or DEFAULT_BINS), 1), BASE_BINS)
+                                ),
+                            ).props("dense").style("width: 100px").bind_visibility_from(
+                                self.config["histogram"], "bin rule", value="Fixed count"
+                            )
 
                         # container for histogram plot
                         self.gui_components["histogram_container"] = ui.element("div").style(
@@ -273,6 +434,21 @@ class MainDataPage:
                         # Add a toggle button for filtering zeros (histogram)
                         self.filter_zeros = False
 
+                    with ui.tab_panel(three).style("border-radius: 10px; background-color:#161616"):
+
+                        with ui.row(align_items="center"):
+                            ui.button("Choose Files", icon="folder", on_click=self.choose_compare_files).props("color=dark")
+                            self.gui_components["compare_dropdown"] = ui.select(
+                                [], label="Column to compare", on_change=self.plot_overlay
+                            ).style("min-width: 200px")
+                            ui.label().bind_text_from(
+                                self, "compare_paths", backward=lambda paths: f"{len(paths)} files" if paths else "No files chosen"
+                            )
+
+                        # container for the overlay plot
+                        self.gui_components["compare_container"] = ui.element("div").style(
+                    "width: 100%; height: 650px;")
+
             # Stats
             ui.separator().style("margin-top: 10px; margin-bottom: 10px;")
             
@@ -298,12 +474,12 @@ class MainDataPage:
             # self.gui_components["second_graph_dropdown"].update()
             # self.gui_components["graph_dropdown"].update()
 
-    def uploadNewFile(self, e):
+    async def uploadNewFile(self, e):
         self.quickUpload = True
         e.sender.reset()
         self.bindings["current file"] = e.content
         self.bindings["file name"] = str(e.name)
-        self.pick_dat_file()
+        await self.pick_dat_file()
 
     def reset_lines(self):
         """Reset the vertical and horizontal lines by clearing the input fields."""
@@ -321,16 +497,20 @@ class MainDataPage:
     def changeTabHandler(self, e):
         if(e.value == 'Histogram'):
             self.gui_components['current tab'] = 'histogram'
-            self.plot_histogram()
+            self.refresh_histogram()
+        elif(e.value == 'Compare'):
+            self.gui_components['current tab'] = 'compare'
         else:
             self.gui_components['current tab'] = 'plot'
             self.plot_selected_column()
 
-    def save_current_tab(self):
+    async def save_current_tab(self):
         if self.gui_components['current tab'] == 'histogram':
-            self.save_histogram_as_jpg()
+            await self.save_histogram_as_jpg()
+        elif self.gui_components['current tab'] == 'compare':
+            await self.save_compare_plot()
         else:
-            self.save_main_plot_as_jpg()
+            await self.save_main_plot_as_jpg()
 
     
     async def get_save_path(self):
@@ -379,11 +559,11 @@ class MainDataPage:
                 on_click=lambda: self.pick_recent(4),
             )
 
-    def pick_recent(self, num):
+    async def pick_recent(self, num):
         self.quickUpload = False
         self.bindings["current file"] = self.config["recent files"]["recents"][num]
         self.add_new_file()
-        self.pick_dat_file()
+        await self.pick_dat_file()
 
     async def get_path(self):
         self.quickUpload = False
@@ -394,7 +574,7 @@ class MainDataPage:
             if result:
                 self.bindings["current file"] = result[0]
                 self.add_new_file()
-                self.pick_dat_file()
+                await self.pick_dat_file()
 
         except Exception as ex:
             logger.opt(exception=True).error(f"Error reading .dat file.")
@@ -417,19 +597,28 @@ class MainDataPage:
         with open(self.config_filepath, "w") as file:
             toml.dump(self.config, file)
 
-    def pick_dat_file(self):
+    @traced("open file")
+    async def pick_dat_file(self):
 
         if self.quickUpload:
             logger.info(f"DAT file {self.bindings["file name"]} selected")
         else:
             logger.info(f"DAT file {self.bindings["current file"]} selected")
 
+        # Drop the old file first so dropdown changes below don't start loads against it
+        self.stop_follow()
+        self.dat_file_data = None
+        if self.profile_cancel is not None:
+            self.profile_cancel.set()
+        self.column_profile = None
 
         # Clear previous plots and histograms
         if self.gui_components["plot_container"]:
             self.gui_components["plot_container"].clear()
+            self.plot = None
         if self.gui_components["histogram_container"]:
             self.gui_components["histogram_container"].clear()
+        self.histogram_key = None
 
         # Reset dropdowns
         self.gui_components["graph_dropdown"].value = "Select Graph"
@@ -439,34 +628,66 @@ class MainDataPage:
         self.gui_components["graph_dropdown"].update()
         self.gui_components["second_graph_dropdown"].update()
 
-        # Load the dat file using polars
-        self.dat_file_data = pl.read_csv(
-            self.bindings["current file"], separator=" ", has_header=True
+        # Load the dat file header on a worker thread; columns are parsed when they are first plotted
+        self.clear_column_caches()
+        self.zoom_generation += 1  # drop zoom stats still being computed for the old file
+        self.x_range_indices = slice(None)
+        self.stream_summary = None
+        streaming = self.should_stream(self.bindings["current file"])
+        dat_file = await self.run_load(
+            "Opening file",
+            DatFile,
+            self.bindings["current file"],
+            lazy=streaming or self.config["loading"]["lazy"],
+            cache=self.file_cache,
+            compact=self.config["loading"].get("compact columns", True),
+            # A streamed file is read batch by batch once; converting it too would be a second full pass
+            store=not streaming,
         )
+        if dat_file is None:
+            return
+
         # Filter columns to include only ints and floats
-        columns = [
-            col
-            for col, dtype in self.dat_file_data.schema.items()
-            if dtype in [pl.Float64, pl.Int64, pl.Float32, pl.Int32]
-        ]
+        columns = dat_file.numeric_columns()
+        x_column = self.gui_components["x_axis_dropdown"].value
+
+        if streaming:
+            # Too large to hold in memory: one pass builds every column's stats, histogram and overview
+            logger.info(f"Summarizing {self.bindings['current file']} in batches instead of loading it")
+            summary = await self.run_load(
+                "Summarizing file", summarize, dat_file, columns,
+                [x_column] if x_column in dat_file else [], self.max_plot_points,
+            )
+            if summary is None:
+                return
+            self.stream_summary = summary
+        self.dat_file_data = dat_file
 
         if self.quickUpload:
             self.bindings["current file"] = self.bindings["file name"]
 
         logger.info(f"Columns loaded: {columns}")
 
-        # Update dropdown options
-        self.gui_components["graph_dropdown"].options = columns
+        # Update dropdown options, ordered by the profile saved when the file was last opened, if any
+        path = self.profile_path()
+        if path is not None and self.stream_summary is None:
+            self.column_profile = await run.io_bound(FileProfile.load, path)
         self.largeList = columns
-        self.gui_components["second_graph_dropdown"].options = ["None"] + columns
-        self.gui_components["graph_dropdown"].update()
-        self.gui_components["second_graph_dropdown"].update()
+        self.update_column_options()
+        shown = list(self.gui_components["graph_dropdown"].options)
+
+        # Read the x column along with the first column that will be auto-plotted
+        if not await self.load_columns(x_column, shown[:1]):
+            return
 
         # Set the initial min and max range based on the x-axis data
-        x_column = self.gui_components["x_axis_dropdown"].value
-        self.x_data = self.dat_file_data[x_column].to_numpy()
-        x_beginning = self.x_data.min()
-        x_end = self.x_data.max()
+        if self.stream_summary is not None:
+            x_beginning, x_end = self.stream_summary.x_ranges.get(x_column, (None, None))
+        else:
+            self.x_index = self.x_axis_index(x_column)
+            self.x_data = self.x_index.x
+            x_beginning = self.x_index.sorted_x[0]
+            x_end = self.x_index.sorted_x[-1]
 
         # Store the original range for resetting
         self.original_min_max = {"min": x_beginning, "max": x_end}
@@ -474,12 +695,434 @@ class MainDataPage:
         self.bindings["zoom"][0] = self.original_min_max["min"]
         self.bindings["zoom"][1] = self.original_min_max["max"]
 
-        # Auto-plot the first column or default to instructions
-        if len(columns) > 0:
-            self.gui_components["graph_dropdown"].value = columns[0]
+        # Auto-plot the first column or default to instructions; the dropdown's change handler draws it
+        if len(shown) > 0:
+            self.gui_components["graph_dropdown"].value = shown[0]
             self.gui_components["graph_dropdown"].update()
-            self.plot_selected_column()  # Automatically plot the first column`
 
+        # Streamed files already have their stats from the summary pass
+        if self.column_profile is None and self.stream_summary is None and self.config["profile"]["enabled"]:
+            background_tasks.create(self.profile_file(dat_file))
+
+    def profile_path(self):
+        """Sidecar file keeping the open file's column profile next to its cache entry, or None if it isn't kept."""
+        source = self.dat_file_data.source if self.dat_file_data is not None else None
+        if self.file_cache is None or not isinstance(source, (str, Path)):
+            return None
+        return self.file_cache.sidecar_path(source, "profile")
+
+    async def profile_file(self, dat_file):
+        """Profile every numeric column of the open file on a worker thread, then reorder the dropdowns by it."""
+        self.profile_cancel = cancel = threading.Event()
+        columns = dat_file.numeric_columns()
+        started = datetime.now()
+        try:
+            profile = await run.io_bound(profile_columns, dat_file, columns, cancel=cancel)
+        except LoadCancelled:
+            return
+        except Exception as ex:
+            logger.error(f"Failed to profile the columns of {self.bindings['current file']}: {ex}")
+            return
+        if dat_file is not self.dat_file_data:
+            return
+        logger.info(f"Profiled {len(columns)} columns in {(datetime.now() - started).total_seconds():.1f} s")
+
+        self.column_profile = profile
+        path = self.profile_path()
+        # A followed file has grown past the version the sidecar would be keyed to
+        if path is not None and not self.following:
+            try:
+                await run.io_bound(profile.save, path)
+            except OSError as ex:
+                logger.error(f"Failed to save the column profile: {ex}")
+        self.update_column_options()
+
+    def update_column_options(self):
+        """Fill the y-axis dropdowns with the open file's numeric columns, ordered and labelled by its profile."""
+        columns = self.dat_file_data.numeric_columns()
+        profile = self.column_profile
+        if profile is not None:
+            shown = profile.order(columns, self.config["profile"]["sort by"], self.config["profile"]["hide constant"])
+        else:
+            shown = columns
+        options = {column: profile.label(column) if profile is not None else column for column in shown}
+
+        for dropdown, extra in (("graph_dropdown", {}), ("second_graph_dropdown", {"None": "None"})):
+            dropdown = self.gui_components[dropdown]
+            selected = {}
+            # Keep a selected column listed even if it is now hidden, so the plot isn't cleared under the user
+            if dropdown.value in columns and dropdown.value not in options:
+                selected[dropdown.value] = profile.label(dropdown.value)
+            dropdown.options = {**extra, **options, **selected}
+            dropdown.update()
+
+    def set_profile_option(self, key, value):
+        """Store a dropdown ordering setting in the config and relist the columns with it."""
+        self.config["profile"][key] = value
+        self.save_config_file()
+        if self.dat_file_data is not None:
+            self.update_column_options()
+
+    def clear_column_caches(self):
+        """Drop everything built from the loaded columns, so it is rebuilt from their current rows."""
+        self.column_generation += 1
+        self.pyramids = {}
+        self.x_indexes = {}
+        self.nonzero_masks = {}
+        self.resamplers = {}
+        self.tail_summaries = {}
+        self.stats_cache.clear()
+        self.trace_cache.clear()
+        self.histogram_cache.clear()
+
+    async def set_follow(self, e):
+        """Handler for the Follow switch."""
+        if e.value:
+            await self.start_follow()
+        else:
+            self.stop_follow()
+
+    async def start_follow(self):
+        """Keep reading rows appended to the open file and push them to the plot and stats."""
+        dat_file = self.dat_file_data
+        if self.following:
+            return
+        if (
+            dat_file is None
+            or not isinstance(dat_file.source, (str, Path))
+            or self.stream_summary is not None
+            or self.resample_settings() is not None
+        ):
+            ui.notify("Follow needs a file opened from disk, without resampling", color="red")
+            self.gui_components["follow_switch"].value = False
+            return
+
+        # Re-read the plotted columns up to the last complete line, then only appended bytes are read
+        if await self.run_load("Following file", dat_file.follow) is None or dat_file is not self.dat_file_data:
+            self.gui_components["follow_switch"].value = False
+            return
+        logger.info(f"Following {dat_file.source}")
+        self.clear_column_caches()
+        self.following = True
+        self.tail_timer.active = True
+        self.plotted_columns = None  # redraw from the re-read columns
+        self.plot_selected_column()
+
+    def stop_follow(self):
+        """Stop reading appended rows; what was read so far stays loaded."""
+        if not self.following:
+            return
+        self.following = False
+        self.tail_timer.active = False
+        self.gui_components["follow_switch"].value = False
+        logger.info("Stopped following file")
+
+    async def read_tail(self):
+        """Timer callback: read rows appended since the last check and add them to the plot and stats."""
+        dat_file = self.dat_file_data
+        if not self.following or self.tail_busy or dat_file is None:
+            return
+        self.tail_busy = True
+        try:
+            frame, end = await run.io_bound(dat_file.read_appended)
+        except Exception as ex:
+            logger.error(f"Error following file: {ex}")
+            ui.notify(f"Stopped following: {ex}", color="red")
+            self.stop_follow()
+            return
+        finally:
+            self.tail_busy = False
+
+        if not self.following or dat_file is not self.dat_file_data or frame.height == 0:
+            return
+        if not dat_file.append(frame, end):
+            return
+        self.append_rows(frame)
+
+    def append_rows(self, frame):
+        """Fold newly appended rows into the stats and push them to the live plot.
+
+        Everything here scales with the new rows or the plotted points, never
+        with the file, so a long session keeps a constant cost per update.
+        Indexes built over the whole file are dropped, and rebuilt on a worker
+        thread only if a zoom or a new selection needs them.
+        """
+        summaries = self.tail_summaries
+        self.clear_column_caches()
+        self.tail_summaries = summaries
+        self.tail_stale = True
+        for column, summary in summaries.items():
+            summary.update(frame[column].to_numpy())
+
+        if self.plot is not None and self.plotted_columns is not None:
+            self.extend_plot(frame)
+        background_tasks.create(self.update_summary_stats())
+        if self.gui_components["current tab"] == "histogram":
+            self.histogram_key = None
+            self.refresh_histogram()
+
+    def extend_plot(self, frame):
+        """Append new rows to the plot traces, decimated to the density of the whole-file view."""
+        x_column = self.plotted_columns[0]
+        x_new = frame[x_column].to_numpy()
+        # Rows each plotted point stands for when the whole file is in view
+        bucket = max(len(self.dat_file_data[x_column]) / self.max_plot_points, 1)
+
+        extend = {"x": [], "y": []}
+        compact = False
+        for trace in self.plot_figure.data:
+            y_new = frame[trace.name].to_numpy()
+            indices = minmax_indices(y_new, 2 * math.ceil(len(y_new) / bucket))
+            x_add, y_add = self.compact_trace(x_new[indices], y_new[indices])
+            extend["x"].append(x_add)
+            extend["y"].append(y_add)
+            trace.x = np.concatenate([trace.x, x_add])
+            trace.y = np.concatenate([trace.y, y_add])
+            compact = compact or len(trace.x) > 2 * self.max_plot_points
+
+        layout = {}
+        if not self.isZoomed:
+            # Keep the whole run in view as it grows
+            self.original_min_max["max"] = max(self.original_min_max["max"], float(np.nanmax(x_new)))
+            self.bindings["zoom"][1] = self.original_min_max["max"]
+            self.tail_x_range = [self.bindings["zoom"][0], self.bindings["zoom"][1]]
+            layout["xaxis.range"] = self.tail_x_range
+            self.plot_figure.update_layout(layout)
+            self.plot_state = self.current_plot_state()
+
+        if compact:
+            # Re-decimate what is plotted rather than the file, so this stays bounded too
+            traces = {"x": [], "y": []}
+            for trace in self.plot_figure.data:
+                trace.x, trace.y = minmax_decimate(np.asarray(trace.x), np.asarray(trace.y), self.max_plot_points)
+                traces["x"].append(trace.x)
+                traces["y"].append(trace.y)
+            self.run_plot_method("update", traces, layout)
+        else:
+            self.run_plot_method("extendTraces", extend, list(range(len(extend["x"]))))
+            if layout:
+                self.run_plot_method("relayout", layout)
+
+        self.plot.sync_figure()
+
+    async def refresh_tail_data(self):
+        """Re-point x_index and the y data at the current rows, if a follow update appended to them.
+
+        Their indexes are rebuilt by load_columns on a worker thread. Returns
+        False if that was cancelled or the plot was replaced meanwhile.
+        """
+        columns = self.plotted_columns
+        if not self.tail_stale or columns is None:
+            return True
+        # The tuple also holds the settings the plot was drawn with; only the columns matter here
+        x_column, y_column_1, y_column_2 = columns[:3]
+        while self.tail_stale:
+            self.tail_stale = False
+            loaded = await self.load_columns(x_column, [y_column_1, y_column_2])
+            if self.plotted_columns is not columns:
+                return False
+            if not loaded:
+                self.tail_stale = True
+                return False
+            # Rows appended during the load dropped its indexes again, so go round once more
+        self.x_index = self.x_axis_index(x_column)
+        self.x_data = self.x_index.x
+        self.y_data_1 = self.column_pyramid(y_column_1).data
+        self.y_data_2 = self.column_pyramid(y_column_2).data if y_column_2 is not None else None
+        return True
+
+    def set_tracing(self, e):
+        """Handler for the Timing overlay switch; the setting is kept in the config."""
+        tracer.enabled = e.value
+        self.trace_overlay.visible = e.value
+        self.config["debug"]["trace"] = e.value
+        self.save_config_file()
+
+    def show_trace(self, name, total, stages):
+        """Tracer listener: show an interaction's stages and payload sizes in the overlay."""
+        self.trace_overlay.clear()
+        with self.trace_overlay:
+            ui.label(f"{name}: {total:.1f} ms").classes("font-semibold")
+            for stage, ms, details in stages:
+                size = f", {details['bytes'] / 1024:.1f} KB" if "bytes" in details else ""
+                ui.label(f"{stage}: {ms:.1f} ms{size}").classes("text-xs")
+
+    def save_trace(self):
+        """Write the recorded spans as a Chrome trace file next to the saved plots."""
+        if not tracer.events:
+            ui.notify("Nothing traced yet; turn on the timing overlay first", color="red")
+            return
+        filename = f"datplot_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        save_location = Path(self.config['save plots']['path']) / Path(filename)
+        try:
+            tracer.dump(save_location)
+        except Exception as ex:
+            ui.notify(f"Error saving trace: {ex}", color="red")
+            logger.error(f"Error saving trace: {ex}")
+            return
+        ui.notify(f"Trace saved as {filename}", color="green")
+
+    def should_stream(self, source):
+        """Whether a file is too large to load and should be summarized batch by batch instead."""
+        if not isinstance(source, (str, Path)):
+            return False
+        limit = self.config["loading"].get("stream above mb", STREAM_ABOVE_MB)
+        return os.path.getsize(source) > limit * 1024 * 1024
+
+    async def run_load(self, label, func, *args, **kwargs):
+        """Run a loading function on a worker thread behind the progress bar.
+
+        Any load already in flight is cancelled first, so only the newest one
+        finishes. Returns the function's result, or None if the load was
+        cancelled or failed.
+        """
+        self.cancel_load()
+        cancel = threading.Event()
+        status = {"done": 0, "total": 0, "label": label}
+        self.load_cancel = cancel
+        self.load_status = status
+
+        def progress(done, total):
+            status["done"] = done
+            status["total"] = total
+
+        self.gui_components["load_progress"].visible = True
+        try:
+            with tracer.span(label):
+                result = await run.io_bound(func, *args, progress=progress, cancel=cancel, **kwargs)
+            return None if cancel.is_set() else result
+        except LoadCancelled:
+            logger.info(f"{label} cancelled")
+            return None
+        except Exception as ex:
+            logger.opt(exception=True).error(f"{label} failed: {ex}")
+            ui.notify(f"{label} failed: {ex}", color="red")
+            return None
+        finally:
+            if self.load_cancel is cancel:
+                self.load_cancel = None
+                self.gui_components["load_progress"].visible = False
+
+    def cancel_load(self):
+        """Stop the load in flight, if any, at its next chunk boundary."""
+        if self.load_cancel is not None:
+            self.load_cancel.set()
+
+    def update_load_progress(self):
+        """Refresh the progress bar from the worker's byte counts."""
+        if self.load_cancel is None:
+            return
+        status = self.load_status
+        if status["total"]:
+            self.load_progress_bar.value = status["done"] / status["total"]
+            self.load_progress_label.text = (
+                f"{status['label']}: {status['done'] / 1e6:.0f} of {status['total'] / 1e6:.0f} MB"
+            )
+        else:
+            self.load_progress_bar.value = 0
+            self.load_progress_label.text = f"{status['label']}..."
+
+    async def load_columns(self, x_column, y_columns):
+        """Parse columns and build their indexes on a worker thread.
+
+        Returns False if the load was cancelled or a different file was opened meanwhile.
+        """
+        dat_file = self.dat_file_data
+        if dat_file is None:
+            return False
+        if self.stream_summary is not None:
+            return await self.load_overviews(x_column)
+
+        # Keys are worked out now, in case the settings change while the load runs
+        keys = {col: self.series_key(col, x_column) for col in [x_column, *y_columns]}
+        need_x = x_column if x_column in dat_file and keys[x_column] not in self.x_indexes else None
+        need_y = [col for col in dict.fromkeys(y_columns) if col in dat_file and keys[col] not in self.pyramids]
+        if need_x is None and not need_y:
+            return True
+
+        resample = None
+        settings = self.resample_settings()
+        if settings is not None and x_column in dat_file:
+            resample = (x_column, *settings)
+
+        result = await self.run_load(
+            "Reading columns", self.prepare_columns, dat_file, need_x, need_y,
+            resample=resample, resampler=self.resamplers.get(resample),
+        )
+        if result is None or dat_file is not self.dat_file_data:
+            return False
+
+        x_index, pyramids, resampler = result
+        if resampler is not None:
+            self.resamplers[resample] = resampler
+            if resampler.rate != resample[1]:
+                ui.notify(f"Resample rate lowered to {resampler.rate:g} to keep the grid in memory", color="orange")
+        if x_index is not None:
+            self.x_indexes[keys[need_x]] = x_index
+            logger.info(f"X column {need_x} sorted: {x_index.is_sorted}")
+        for column, pyramid in pyramids.items():
+            self.pyramids[keys[column]] = pyramid
+        return True
+
+    async def load_overviews(self, x_column):
+        """Build overviews of every column against a newly chosen x column of a streamed file."""
+        summary = self.stream_summary
+        if x_column in summary.overviews or x_column not in self.dat_file_data:
+            return True
+        result = await self.run_load(
+            "Summarizing file", summarize, self.dat_file_data, list(summary.columns), [x_column],
+            self.max_plot_points, stats=False, summary=summary,
+        )
+        return result is not None and summary is self.stream_summary
+
+    def columns_prepared(self, x_column, y_columns):
+        """True if load_columns has read these columns and built their x index and pyramids."""
+        y_columns = [col for col in y_columns if col in self.dat_file_data]
+        if not self.dat_file_data.is_loaded([x_column, *y_columns]):
+            return False
+        return self.series_key(x_column) in self.x_indexes and all(
+            self.series_key(col) in self.pyramids for col in y_columns
+        )
+
+    @staticmethod
+    def prepare_columns(dat_file, x_column, y_columns, resample=None, resampler=None, progress=None, cancel=None):
+        """Parse columns and build their x index and pyramids.
+
+        With resample set to (x column, rate, method) the columns are first regridded
+        onto a uniform time base, reusing resampler if one was already built for it.
+        Runs on a worker thread, so it only touches the objects it is given.
+        """
+        columns = [x_column, *y_columns] if x_column else list(y_columns)
+        if resample is not None:
+            columns.append(resample[0])
+        dat_file.load(columns, progress=progress, cancel=cancel)
+
+        if resample is not None and resampler is None:
+            resampler = Resampler(dat_file.array(resample[0]), *resample[1:])
+
+        x_index = None
+        if x_column:
+            x_index = XAxisIndex(resampler.grid if resampler else dat_file.array(x_column))
+        pyramids = {}
+        for column in y_columns:
+            if cancel is not None and cancel.is_set():
+                raise LoadCancelled()
+            data = dat_file.array(column)
+            pyramids[column] = ColumnPyramid(resampler.resample(data) if resampler else data)
+        return x_index, pyramids, resampler
+
+    @traced("select columns")
+    async def on_selection_change(self):
+        """Read any newly selected columns in the background, then redraw."""
+        x_column = self.gui_components["x_axis_dropdown"].value
+        y_columns = [
+            self.gui_components["graph_dropdown"].value,
+            self.gui_components["second_graph_dropdown"].value,
+        ]
+        if await self.load_columns(x_column, y_columns):
+            self.plot_selected_column()
+
+    @traced("plot")
     def plot_selected_column(self):
         """Plot the selected columns from the .dat file."""
 
@@ -490,149 +1133,550 @@ class MainDataPage:
         x_column = self.gui_components["x_axis_dropdown"].value  # x axis
 
         if self.dat_file_data is not None and y_column_1 in self.dat_file_data.columns:
-            self.x_data = self.dat_file_data[x_column].to_numpy()
-
-            self.y_data_1 = self.dat_file_data[y_column_1].to_numpy()
-            self.y_data_2 = None
+            if self.isZoomed:
+                self.bindings["zoom"][0] = self.range_start
+                self.bindings["zoom"][1] = self.range_end
 
-            # Create the first trace for the left y-axis
-            self.plot_figure = go.Figure(
-                data=go.Scatter(x=self.x_data, y=self.y_data_1, name=y_column_1, yaxis="y1")
+            # Same columns already on screen, so only send what changed
+            columns = (
+                x_column,
+                y_column_1,
+                y_column_2 if y_column_2 in self.dat_file_data.columns else None,
+                self.resample_settings(),
+                self.render_settings(),
             )
+            if self.plot is not None and columns == self.plotted_columns:
+                self.patch_plot()
+                return
+
+            if self.stream_summary is not None:
+                # Only the overviews of a streamed file are in memory, so they stand in for the data
+                if x_column not in self.stream_summary.overviews:
+                    return
+                self.x_data, self.y_data_1 = self.decimate_for_view(y_column_1)
+            else:
+                if not self.columns_prepared(x_column, [y_column_1, y_column_2]):
+                    # Parsing or indexing here would block the GUI with no progress or cancel.
+                    # A load in flight draws them when it finishes; otherwise (a cancelled read,
+                    # or appended rows dropped the indexes) one is started.
+                    logger.debug(f"Columns for {y_column_1} not ready, not plotting yet")
+                    if self.load_cancel is None and x_column in self.dat_file_data:
+                        background_tasks.create(self.on_selection_change())
+                    return
+
+                self.x_index = self.x_axis_index(x_column)
+                self.x_data = self.x_index.x
+
+                self.y_data_1 = self.column_pyramid(y_column_1).data
+            self.y_data_2 = None
 
-            plotTitle = f"Plot of {y_column_1} vs {x_column}"
-
-            # If a second Y-axis column is selected, add it as a second trace
+            # Second trace on the right y-axis if a second column is selected
+            xy_1 = self.decimate_for_view(y_column_1)
+            xy_2 = None
             if (
                 y_column_2 != "Select Graph"
                 and y_column_2 in self.dat_file_data.columns
             ):
-                self.y_data_2 = self.dat_file_data[y_column_2].to_numpy()
-                self.plot_figure.add_trace(
-                    go.Scatter(x=self.x_data, y=self.y_data_2, name=y_column_2, yaxis="y2")
+                xy_2 = self.decimate_for_view(y_column_2)
+                self.y_data_2 = xy_2[1] if self.stream_summary is not None else self.column_pyramid(y_column_2).data
+
+            # Reference lines from the control panel
+            self.plot_state = self.current_plot_state()
+            with tracer.span("build figure"):
+                self.plot_figure = line_figure(
+                    x_column,
+                    y_column_1,
+                    xy_1,
+                    y_column_2,
+                    xy_2,
+                    x_range=self.bindings["zoom"],  # Use zoom range based on the control panel
+                    box_zoom=self.bindings["box zoom"],
+                    shapes=self.plot_state["layout"]["shapes"],
+                    webgl=self.plot_webgl([xy for xy in (xy_1, xy_2) if xy is not None]),
                 )
-                plotTitle = f"Plot of {y_column_1} and {y_column_2} vs {x_column}"
-
-            if self.isZoomed:
-                self.bindings["zoom"][0] = self.range_start
-                self.bindings["zoom"][1] = self.range_end
-
-            # Update layout to add second Y-axis on the right side
-            self.plot_figure.update_layout(
-                template="plotly_dark",
-                title=plotTitle,
-                autosize=True,  # plot auto-resize
-                height=None,  # height determined by the container
-                yaxis=dict(
-                    title=y_column_1, side="left", fixedrange=self.bindings["box zoom"]
-                ),
-                yaxis2=dict(
-                    title=y_column_2,
-                    side="right",
-                    overlaying="y",  # Overlay on the same x-axis
-                    position=1,  # Position the second Y-axis on the right
-                ),
-                xaxis=dict(
-                    title=x_column,
-                    range=[
-                        self.bindings["zoom"][0],
-                        self.bindings["zoom"][1],
-                    ],  # Use zoom range based on the control panel
-                    rangeslider=dict(visible=True),
-                ),
-            )
-
-            # Add vertical line if x position is provided
-            if self.gui_components["vertical_line_input"].value:
-                try:
-                    x_position = float(self.gui_components["vertical_line_input"].value)
-                    self.plot_figure.add_vline(x=x_position, line_dash="dash", line_color="green")
-                except ValueError:
-                    logger.error("Invalid vertical line position")
-
-            # Add horizontal line if y position is provided
-            if self.gui_components["horizontal_line_input"].value:
-                try:
-                    y_position = float(
-                        self.gui_components["horizontal_line_input"].value
-                    )
-                    self.plot_figure.add_hline(y=y_position, line_dash="dash", line_color="yellow")
-                except ValueError:
-                    logger.error("Invalid horizontal line position")
 
             # Clear the container before adding the new plot
             self.gui_components["plot_container"].clear()  # Remove previous plot
 
             # Add the new plot
-            with self.gui_components["plot_container"]:
-                ui.plotly(self.plot_figure).on('plotly_relayout', handler=self.handle_relayout).style(
+            with self.gui_components["plot_container"], tracer.span("send figure") as span:
+                self.plot = LivePlot(self.plot_figure).on('plotly_relayout', handler=self.handle_relayout).style(
                     "width: 100%; height: 100%;"
                 )  
+                if tracer.enabled:
+                    # Serialized again just to measure it, so only while tracing
+                    span["bytes"] = len(to_json_plotly(self.plot_figure))
                 # ui.plotly(self.plot_figure).style(
                 #      "width: 100%; height: 100%;"
                 #  )  
-            
+
+            self.plotted_columns = columns
             self.bindings["graph rendered"] = True
 
-            # histogram plot
-            self.plot_histogram()
+            # histogram plot, drawn now only if its tab is showing
+            if self.gui_components['current tab'] == 'histogram':
+                self.refresh_histogram()
+
+            # Update the summary statistics after plotting; any not yet computed are worked out off the event loop
+            background_tasks.create(self.update_summary_stats())
+
+    def resample_settings(self):
+        """(rate, method) the plotted columns are regridded at, or None to plot the raw samples."""
+        rate = self.config["resample"]["rate"]
+        return (rate, self.config["resample"]["method"]) if rate else None
+
+    def series_key(self, column, x_column=None):
+        """Name for a column as plotted: just the column, or with the x column and rate it was resampled against."""
+        settings = self.resample_settings()
+        if settings is None:
+            return column
+        return (column, x_column or self.gui_components["x_axis_dropdown"].value, *settings)
+
+    def resampler(self):
+        """Return the resampler for the current x column and settings, building it on first use."""
+        key = (self.gui_components["x_axis_dropdown"].value, *self.resample_settings())
+        if key not in self.resamplers:
+            self.resamplers[key] = Resampler(self.dat_file_data.array(key[0]), *key[1:])
+        return self.resamplers[key]
+
+    def x_axis_index(self, column):
+        """Return the range index for an x column, checking its sortedness on first use."""
+        key = self.series_key(column)
+        if key not in self.x_indexes:
+            if self.resample_settings() is None:
+                self.x_indexes[key] = XAxisIndex(self.dat_file_data.array(column))
+            else:
+                self.x_indexes[key] = XAxisIndex(self.resampler().grid)
+            logger.info(f"X column {column} sorted: {self.x_indexes[key].is_sorted}")
+        return self.x_indexes[key]
+
+    def column_pyramid(self, column):
+        """Return the pyramid index for a column, building it the first time it is plotted."""
+        key = self.series_key(column)
+        if key not in self.pyramids:
+            data = self.dat_file_data.array(column)
+            if self.resample_settings() is not None:
+                data = self.resampler().resample(data)
+            self.pyramids[key] = ColumnPyramid(data)
+        return self.pyramids[key]
+
+    async def set_resample_option(self, key, value):
+        """Store a resampling setting in the config and replot with it."""
+        if self.config["resample"][key] == value:
+            return
+        self.config["resample"][key] = value
+        self.save_config_file()
+        await self.on_selection_change()
+
+    def decimate_for_view(self, column):
+        """Downsample a y column against the x data for the current x-axis window."""
+        if self.stream_summary is not None:
+            # A streamed file only has its fixed overview, whatever the window
+            return self.stream_summary.overviews[self.gui_components["x_axis_dropdown"].value][column].xy()
+
+        start, end = self.bindings["zoom"]
+        key = (
+            id(self.dat_file_data),
+            self.gui_components["x_axis_dropdown"].value,
+            self.series_key(column),
+            start,
+            end,
+            self.max_plot_points,
+        )
 
-            # Update the summary statistics after plotting
-            self.update_summary_stats()
+        def decimate():
+            with tracer.span("decimate", column=column):
+                pyramid = self.column_pyramid(column)
+                return self.compact_trace(*decimate_window(
+                    self.x_data,
+                    pyramid.data,
+                    start,
+                    end,
+                    self.max_plot_points,
+                    pyramid=pyramid,
+                    x_index=self.x_index,
+                ))
+
+        return self.trace_cache.get_or_compute(key, decimate)
+
+    def compact_trace(self, x, y):
+        """Trace arrays as float32 where that is lossless on screen and enabled in the config, halving their payload."""
+        if not self.config["plot"]["float32 traces"]:
+            return x, y
+        return compact_array(x), compact_array(y)
+
+    def render_settings(self):
+        """(mode, threshold) deciding between SVG and WebGL traces, see use_webgl."""
+        return (
+            self.config["plot"].get("render mode", "auto"),
+            self.config["plot"].get("webgl above rows", WEBGL_ABOVE_ROWS),
+        )
 
-  
+    def plot_webgl(self, traces):
+        """Whether traces, a list of (x, y), should be drawn with WebGL under the render settings.
+
+        The threshold counts the raw rows in the x window for every trace, not
+        the decimated points, which stay near max_plot_points at any zoom.
+        """
+        mode, threshold = self.render_settings()
+        return use_webgl(mode, self.window_rows() * len(traces), threshold)
+
+    def window_rows(self):
+        """Rows of the x column inside the current x window, before decimation."""
+        if self.stream_summary is not None:
+            # Only the fixed overview is drawn, standing in for every row
+            return self.dat_file_data.estimated_rows()
+        start, end = self.bindings["zoom"]
+        span = self.x_index.row_span(
+            start if start is not None else -math.inf, end if end is not None else math.inf
+        )
+        return 0 if span is None else span[1] - span[0]
 
+    def set_render_option(self, key, value):
+        """Store a rendering setting in the config and redraw the plot with it."""
+        if self.config["plot"].get(key) == value:
+            return
+        self.config["plot"][key] = value
+        self.save_config_file()
+        if self.dat_file_data is not None:
+            self.plot_selected_column()
 
-    def plot_histogram(self):
-        """Plot a histogram based on the two selected Y-axis columns."""
-        fig = go.Figure()
+    def redecimate_plot(self):
+        """Re-send the plot traces downsampled for the newly visible x range."""
+        if self.plot is None or self.plot_figure is None:
+            return
 
-        y_column_1 = self.gui_components["graph_dropdown"].value
-        y_column_2 = self.gui_components["second_graph_dropdown"].value
+        self.bindings["zoom"][0] = self.range_start
+        self.bindings["zoom"][1] = self.range_end
+        self.patch_plot()
 
-        if self.y_data_1 is None or self.y_data_2 is None:
-            if y_column_1 in self.dat_file_data.columns:
-                self.y_data_1 = self.dat_file_data[y_column_1].to_numpy()
-            if y_column_2 in self.dat_file_data.columns:
-                self.y_data_2 = self.dat_file_data[y_column_2].to_numpy()
+    def reference_line_shapes(self):
+        """Layout shapes for the vertical and horizontal reference lines in the control panel."""
+        shapes = []
 
-        # Filter out zeros if the filter is active
-        if self.filter_zeros:
-            self.y_data_1 = self.y_data_1[self.y_data_1 != 0]
-            if self.y_data_2 is not None:
-                self.y_data_2 = self.y_data_2[self.y_data_2 != 0]
+        # Add vertical line if x position is provided
+        if self.gui_components["vertical_line_input"].value:
+            try:
+                x_position = float(self.gui_components["vertical_line_input"].value)
+                shapes.append(dict(
+                    type="line", xref="x", yref="y domain", x0=x_position, x1=x_position, y0=0, y1=1,
+                    line=dict(dash="dash", color="green"),
+                ))
+            except ValueError:
+                logger.error("Invalid vertical line position")
+
+        # Add horizontal line if y position is provided
+        if self.gui_components["horizontal_line_input"].value:
+            try:
+                y_position = float(self.gui_components["horizontal_line_input"].value)
+                shapes.append(dict(
+                    type="line", xref="x domain", yref="y", x0=0, x1=1, y0=y_position, y1=y_position,
+                    line=dict(dash="dash", color="yellow"),
+                ))
+            except ValueError:
+                logger.error("Invalid horizontal line position")
+
+        return shapes
+
+    def current_plot_state(self):
+        """Zoom window and the layout settings that can change without new trace data."""
+        zoom = (self.bindings["zoom"][0], self.bindings["zoom"][1])
+        return {
+            "zoom": zoom,
+            "layout": {
+                "xaxis.range": list(zoom),
+                "yaxis.fixedrange": self.bindings["box zoom"],
+                "shapes": self.reference_line_shapes(),
+            },
+        }
 
-        # Add histogram for the first Y-axis column
-        if self.y_data_1 is not None:
-            fig.add_trace(
-                go.Histogram(x=self.y_data_1, name=f"Histogram of {y_column_1}", opacity=0.7)
-            )
+    def patch_plot(self):
+        """Update the live plot in place, sending only the layout keys and traces that changed."""
+        if self.tail_stale:
+            # Rows were appended since the indexes were built; patch once they are rebuilt
+            background_tasks.create(self.refresh_and_patch())
+            return
+        state = self.current_plot_state()
+        layout = {
+            key: value
+            for key, value in state["layout"].items()
+            if self.plot_state["layout"].get(key) != value
+        }
 
-        # Add histogram for the second Y-axis column
-        if self.y_data_2 is not None:
-            fig.add_trace(
-                go.Histogram(x=self.y_data_2, name=f"Histogram of {y_column_2}", opacity=0.7)
+        traces = {}
+        if state["zoom"] != self.plot_state["zoom"]:
+            # New window, so the decimated trace data changes too
+            traces = {"x": [], "y": []}
+            for trace in self.plot_figure.data:
+                trace.x, trace.y = self.decimate_for_view(trace.name)
+                traces["x"].append(trace.x)
+                traces["y"].append(trace.y)
+
+        if traces and self.plot_webgl(list(zip(traces["x"], traces["y"]))) != (self.plot_figure.data[0].type == "scattergl"):
+            # The new window crossed the WebGL threshold, and the trace type only changes with a full redraw
+            self.plotted_columns = None
+            self.plot_selected_column()
+            return
+
+        self.plot_state = state
+        if not layout and not traces:
+            return
+
+        # update_layout merges lists, so shapes are replaced by assignment
+        self.plot_figure.update_layout({key: value for key, value in layout.items() if key != "shapes"})
+        if "shapes" in layout:
+            self.plot_figure.layout.shapes = layout["shapes"]
+        self.run_plot_method("update", traces, layout)
+
+        # Keep the element's stored figure current for when the client re-renders it
+        self.plot.sync_figure()
+
+    async def refresh_and_patch(self):
+        """Rebuild the indexes over appended rows, then patch the plot as patch_plot would have."""
+        if await self.refresh_tail_data() and self.plot is not None:
+            self.patch_plot()
+
+    def run_plot_method(self, name, *args):
+        """Call a plotly.js function on the live plot, sending only its arguments."""
+        with tracer.span(f"Plotly.{name}") as span:
+            # Arrays go as base64 typed arrays rather than JSON number lists
+            arguments = ", ".join(to_json_plotly(encode_arrays(arg)) for arg in args)
+            span["bytes"] = len(arguments)
+            ui.run_javascript(
+                f"Plotly.{name}(getHtmlElement({self.plot.id}), ...decodeTypedArrays([{arguments}]))"
             )
 
-        # Update layout for the histogram
-        title_text = f"Histogram of {y_column_1}"
-        if y_column_2 != "Select Graph":
-            title_text += f" and {y_column_2}"
-
-        fig.update_layout(
-            template="plotly_dark",
-            title=title_text,
-            xaxis_title="Y Values",
-            yaxis_title="Frequency",
-            barmode="overlay",  # Overlay histograms
-            autosize=True,
+    def histogram_inputs(self):
+        """Everything the histogram depends on; it only needs redrawing when this changes."""
+        return (
+            id(self.dat_file_data),
+            self.gui_components["graph_dropdown"].value,
+            self.gui_components["second_graph_dropdown"].value,
+            self.filter_zeros,
+            self.resample_settings(),
+            self.config["histogram"]["bin rule"],
+            self.config["histogram"]["bins"],
         )
 
+    def set_histogram_option(self, key, value):
+        """Store a binning setting in the config and redraw the histogram with it."""
+        self.config["histogram"][key] = value
+        self.save_config_file()
+        self.refresh_histogram()
+
+    def refresh_histogram(self):
+        """Redraw the histogram if its inputs changed since it was last drawn."""
+        if self.dat_file_data is None or self.histogram_inputs() == self.histogram_key:
+            return
+        background_tasks.create(self.plot_histogram())
+
+    def column_histogram(self, column):
+        """Return the cached base histogram of a column, or None until prepare_views has binned it."""
+        if self.stream_summary is not None:
+            return self.histogram_cache.get_or_compute(
+                (id(self.dat_file_data), column), self.stream_summary.columns[column].histogram.histogram
+            )
+        if self.following:
+            if column not in self.tail_summaries:
+                return None
+            return self.histogram_cache.get_or_compute(
+                (id(self.dat_file_data), column), self.tail_summaries[column].histogram.histogram
+            )
+        return self.histogram_cache.get((id(self.dat_file_data), self.series_key(column)))
+
+    def nonzero_mask(self, column):
+        """Return the cached mask of a column's nonzero rows (see prepare_views), or None when the zero filter is off."""
+        if not self.filter_zeros:
+            return None
+        return self.nonzero_masks.get(self.series_key(column))
+
+    async def prepare_views(self, columns, stats=False, histograms=False):
+        """Build what the zero filter, and optionally the summary stats and histogram, need for columns.
+
+        Only what isn't cached yet is built, on a worker thread, from columns
+        load_columns has already indexed. Inputs are looked up and results
+        stored here on the event loop, under keys made before the await.
+        Returns False if the file changed or rows were appended meanwhile.
+        """
+        dat_file = self.dat_file_data
+        if dat_file is None:
+            return False
+        if self.stream_summary is not None:
+            return True  # the summary pass already built its stats and histograms
+        generation = self.column_generation
+
+        jobs = []
+        for column in dict.fromkeys(columns):
+            if column not in dat_file:
+                continue
+            key = self.series_key(column)
+            pyramid = self.pyramids.get(key)
+            job = {"column": column, "data": None, "mask": self.nonzero_masks.get(key)}
+            if pyramid is not None:
+                job["data"] = pyramid.data
+                if self.filter_zeros and job["mask"] is None:
+                    job["mask key"] = key
+            if self.following:
+                # Appended rows are folded into a running summary, which gives the stats and histogram
+                if (stats or histograms) and column not in self.tail_summaries and dat_file.is_loaded([column]):
+                    job["series"] = dat_file[column]
+            elif pyramid is not None:
+                if stats and self.column_stats(column) is None:
+                    job["stats key"] = self.stats_key(column)
+                if histograms and self.column_histogram(column) is None:
+                    job["histogram key"] = (id(dat_file), key)
+            if set(job) - {"column", "data", "mask"}:
+                jobs.append(job)
+        if not jobs:
+            return True
+
+        with tracer.span("column views", columns=len(jobs)):
+            results = await run.io_bound(
+                self.compute_views, jobs, self.filter_zeros, self.config["stats"]["exact median"]
+            )
+        if dat_file is not self.dat_file_data:
+            return False
+
+        for job, result in zip(jobs, results):
+            if "summary" in result:
+                # Bring it up to rows appended while it was built
+                summary = result["summary"]
+                rows = len(job["series"])
+                if len(dat_file[job["column"]]) > rows:
+                    summary.update(dat_file[job["column"]][rows:].to_numpy())
+                self.tail_summaries[job["column"]] = summary
+        if generation != self.column_generation:
+            return False  # built from rows that have since been extended
+
+        for job, result in zip(jobs, results):
+            if "mask" in result:
+                self.nonzero_masks[job["mask key"]] = result["mask"]
+            if "stats" in result:
+                self.stats_cache.put(job["stats key"], result["stats"])
+            if "histogram" in result:
+                self.histogram_cache.put(job["histogram key"], result["histogram"])
+        return True
+
+    @staticmethod
+    def compute_views(jobs, filter_zeros, exact_median):
+        """Build the masks, stats, histograms and running summaries prepare_views asks for.
+
+        Runs on a worker thread and only uses the arrays it is given.
+        """
+        results = []
+        for job in jobs:
+            result = {}
+            mask = job["mask"]
+            if "mask key" in job:
+                mask = result["mask"] = job["data"] != 0
+            if "stats key" in job:
+                result["stats"] = fused_stats(
+                    job["data"], exact_median=exact_median, mask=mask if filter_zeros else None
+                )
+            if "histogram key" in job:
+                result["histogram"] = ColumnHistogram(job["data"])
+            if "series" in job:
+                summary = ColumnSummary()
+                summary.update(job["series"].to_numpy())
+                result["summary"] = summary
+            results.append(result)
+        return results
+
+    def build_histogram_figure(self):
+        """Pre-binned histogram of the selected columns, using the configured bin rule."""
+        y_column_1 = self.gui_components["graph_dropdown"].value
+        y_column_2 = self.gui_components["second_graph_dropdown"].value
+
+        bars = []
+        for column in (y_column_1, y_column_2):
+            if column not in self.dat_file_data or self.column_histogram(column) is None:
+                continue
+            counts, edges = self.column_histogram(column).bins(
+                self.config["histogram"]["bin rule"], self.config["histogram"]["bins"], self.filter_zeros
+            )
+            bars.append(histogram_bar(column, counts, edges))
+
+        return histogram_figure(bars, y_column_1, y_column_2 if y_column_2 in self.dat_file_data else None)
+
+    @traced("histogram")
+    async def plot_histogram(self):
+        """Plot a histogram based on the two selected Y-axis columns."""
+        inputs = self.histogram_inputs()
+        columns = [self.gui_components["graph_dropdown"].value, self.gui_components["second_graph_dropdown"].value]
+        if not await self.prepare_views(columns, histograms=True) or self.histogram_inputs() != inputs:
+            return  # whatever changed meanwhile draws the histogram again
+
+        # Bins are counted here and only the bar heights go to the browser
+        with tracer.span("bin"):
+            fig = self.build_histogram_figure()
+
         # Clear and update the histogram container
         self.gui_components["histogram_container"].clear()
-        with self.gui_components["histogram_container"]:
+        with self.gui_components["histogram_container"], tracer.span("send histogram") as span:
             ui.plotly(fig).style("width: 100%; height: 100%;")
+            if tracer.enabled:
+                span["bytes"] = len(to_json_plotly(fig))
+        self.histogram_key = self.histogram_inputs()
+
+
+    async def choose_compare_files(self):
+        """Pick several .dat files to overlay in the Compare tab."""
+        try:
+            result = await app.native.main_window.create_file_dialog(allow_multiple=True)
+            if not result:
+                return
+            paths = list(result)
+            # Only headers are read here, a few files at a time
+            columns = await run.io_bound(common_columns, paths)
+        except Exception as ex:
+            logger.opt(exception=True).error(f"Choosing files to compare failed: {ex}")
+            ui.notify(f"Choosing files to compare failed: {ex}", color="red")
+            return
+
+        self.compare_paths = paths
+        dropdown = self.gui_components["compare_dropdown"]
+        dropdown.options = columns
+        dropdown.update()
+        if dropdown.value in columns:
+            await self.plot_overlay()
+        else:
+            # Default to the column on the main plot; the change handler draws it
+            main_column = self.gui_components["graph_dropdown"].value
+            dropdown.value = main_column if main_column in columns else None
+
+    async def plot_overlay(self):
+        """Overlay the chosen column from every compared file on the shared x axis."""
+        column = self.gui_components["compare_dropdown"].value
+        x_column = self.gui_components["x_axis_dropdown"].value
+        if not self.compare_paths or not column:
+            return
+        if x_column not in self.gui_components["compare_dropdown"].options:
+            ui.notify(f"{x_column} is not in every compared file", color="red")
+            return
+
+        runs = await self.run_load(
+            "Reading runs", load_runs, self.compare_paths, x_column, column, cache=self.file_cache
+        )
+        if runs is None:
+            return
+
+        rate, method, origin = None, "interpolate", None
+        settings = self.resample_settings()
+        if settings is not None:
+            rate, method = settings
+            main = self.resamplers.get((x_column, *settings))
+            if main is not None:
+                # On the main plot's grid, including a rate it had to lower
+                rate, origin = main.rate, main.origin
+
+        # Resampled onto one grid and decimated off the event loop
+        traces = await run.io_bound(overlay_traces, runs, self.max_plot_points, rate, method, origin)
+        traces = [(name, *self.compact_trace(x, y)) for name, x, y in traces]
+        self.compare_figure = overlay_figure(traces, x_column, column)
 
+        self.gui_components["compare_container"].clear()
+        with self.gui_components["compare_container"]:
+            ui.plotly(self.compare_figure).style("width: 100%; height: 100%;")
 
     def reset_graph(self):
         """Reset the graph to the original zoom range (full range)."""
@@ -654,33 +1698,103 @@ class MainDataPage:
 
 
 
-    def handle_relayout(self, event):
+    async def handle_relayout(self, event):
+        if self.following and event.args.get("xaxis.range") == self.tail_x_range:
+            return  # the plot echoing the range a follow update just sent
         if 'xaxis.range' in event.args:
             self.range_start = event.args['xaxis.range'][0]
             self.range_end = event.args['xaxis.range'][1]
+            self.zoom_redecimate = True
         elif "xaxis.range[0]" in event.args:
             self.range_start = event.args['xaxis.range[0]']
             self.range_end  = event.args['xaxis.range[1]']
-        self.add_zoom_stats()
+            self.zoom_redecimate = True
+        elif 'xaxis.autorange' in event.args and self.original_min_max:
+            self.range_start = self.original_min_max["min"]
+            self.range_end = self.original_min_max["max"]
+            self.zoom_redecimate = True
+
+        # Dragging the rangeslider fires many events a second; only act once they settle
+        self.zoom_generation += 1
+        generation = self.zoom_generation
+        await asyncio.sleep(RELAYOUT_DEBOUNCE)
+        if generation != self.zoom_generation:
+            return
+        await self.add_zoom_stats()
+
+    @staticmethod
+    def compute_zoom_stats(x_index, start, end, columns, exact_median):
+        """Find the rows in [start, end] and compute stats for each column there.
+
+        columns holds (column, data, pyramid, mask) tuples, resolved on the event
+        loop. Runs on a worker thread and only uses what it is given, so a
+        setting changed meanwhile can't mix into the results, and nothing on the
+        page is built or cached from here.
+        """
+        window = x_index.window(start, end)
+        return window, {
+            column: MainDataPage.compute_range_stats(data, window, pyramid, mask, exact_median)
+            for column, data, pyramid, mask in columns
+        }
 
+    @traced("zoom")
+    async def add_zoom_stats(self):
+        """Refill the plot for the current x range and show its stats.
 
-    def add_zoom_stats(self):
+        Stats are computed on a worker thread. If another zoom update starts
+        before they are ready they are thrown away, so only the latest range is shown.
+        """
         self.isZoomed = True
+        self.zoom_generation += 1
+        generation = self.zoom_generation
+        if not await self.refresh_tail_data() or generation != self.zoom_generation:
+            return
+
+        if self.zoom_redecimate:
+            # Only the visible window is sent at full detail, so refill it for the new range
+            self.zoom_redecimate = False
+            self.redecimate_plot()
+
+        if self.stream_summary is not None:
+            return  # a streamed file's rows aren't in memory to take zoomed stats over
+
         if self.range_start and self.range_end is not None:
             y_column_1 = self.gui_components["graph_dropdown"].value
             y_column_2 = self.gui_components["second_graph_dropdown"].value
+            x_range = (self.range_start, self.range_end)
 
-            self.zoom_stats_container.clear()
+            columns = [(y_column_1, self.y_data_1)]
+            if self.y_data_2 is not None:
+                columns.append((y_column_2, self.y_data_2))
+            # The zero filter's masks are built off the event loop too
+            if not await self.prepare_views([column for column, _ in columns]) or generation != self.zoom_generation:
+                return
+            keys = {column: self.stats_key(column, x_range) for column, _ in columns}
+            cached = {column: self.stats_cache.get(keys[column]) for column, _ in columns}
+            # Everything the worker needs is looked up now, under the settings the keys were made with
+            missing = [
+                (column, data, self.pyramids.get(self.series_key(column)), self.nonzero_mask(column))
+                for column, data in columns
+                if cached[column] is None
+            ]
+
+            # A slice (view) when x is sorted, else a view of the cached argsort
+            with tracer.span("zoom stats", columns=len(missing)):
+                window, computed = await run.io_bound(
+                    self.compute_zoom_stats, self.x_index, *x_range, missing, self.config["stats"]["exact median"]
+                )
+            if generation != self.zoom_generation:
+                return  # a newer range or filter arrived while these were computed
 
-            self.x_range_indices = np.where((self.x_data >= self.range_start) & (self.x_data <= self.range_end))
+            for column, stats in computed.items():
+                self.stats_cache.put(keys[column], stats)
+            cached.update(computed)
+            self.x_range_indices = window
 
-            new_data_y_1 = self.y_data_1[self.x_range_indices]
-            
-            if self.y_data_2 is not None:
-                new_data_y_2 = self.y_data_2[self.x_range_indices]
+            self.zoom_stats_container.clear()
 
-            if new_data_y_1 is not None:
-                stats_1 = self.compute_stats(new_data_y_1)
+            if self.y_data_1 is not None:
+                stats_1 = cached[y_column_1]
                 with self.zoom_stats_container:
                     ui.label(f"Stats for {y_column_1} (Zoomed Region):").classes(
                         "text-lg font-semibold"
@@ -714,8 +1828,7 @@ class MainDataPage:
 
             # Compute and display stats for the second Y-axis column, if selected
             if self.y_data_2 is not None:
-
-                stats_2 = self.compute_stats(new_data_y_2)
+                stats_2 = cached[y_column_2]
                 with self.zoom_stats_container:
                     ui.separator()
 
@@ -749,23 +1862,62 @@ class MainDataPage:
                         ui.button("Copy Stats", on_click=lambda: self.copyStats(stats_2))
     
 
+    def stats_key(self, column, x_range=None):
+        """Key for stats_cache: file, column, zoomed x range (None for the full column) and filters."""
+        return (
+            id(self.dat_file_data),
+            self.series_key(column),
+            self.gui_components["x_axis_dropdown"].value if x_range else None,
+            x_range,
+            self.filter_zeros,
+            self.config["stats"]["exact median"],
+        )
+
+    @staticmethod
+    def compute_range_stats(data, window, pyramid=None, mask=None, exact_median=False):
+        """Stats for the rows of data in window, read from the column's pyramid when the region is contiguous."""
+        window_data = data[window]
+        if mask is not None:
+            # The pyramid counts zeros, so filter the window against the nonzero mask instead
+            return fused_stats(window_data, exact_median=exact_median, mask=mask[window])
+        if pyramid is None or not isinstance(window, slice) or len(window_data) == 0:
+            # x is not sorted, so the region isn't one run of rows
+            return fused_stats(window_data, exact_median=exact_median)
+
+        stats = pyramid.range_stats(window.start, window.stop)
+        stats["median"] = median(window_data, exact_median=exact_median)
+        return stats
+
     def copyStats(self, stats):
         data = f"""Mean: {stats['mean']:.2f}\nMeidan: {stats['median']:.2f}\nStd Dev: {stats['std']:.2f}\nMin: {stats['min']:.2f}\nMax: {stats['max']:.2f}"""
         ui.clipboard.write(data)
         ui.notify("Stats Copied", color='green')
 
 
-    def update_summary_stats(self):
-        """Update the summary statistics for the selected columns."""
+    @traced("summary stats")
+    async def update_summary_stats(self):
+        """Update the summary statistics for the selected columns.
 
-        self.stats_container.clear()  # Clear any existing stats
+        Stats not cached yet are computed on a worker thread. If another update
+        starts before they are ready this one is dropped, as in add_zoom_stats.
+        """
+        self.summary_generation += 1
+        generation = self.summary_generation
 
         y_column_1 = self.gui_components["graph_dropdown"].value
         y_column_2 = self.gui_components["second_graph_dropdown"].value
+        columns = [column for column, data in ((y_column_1, self.y_data_1), (y_column_2, self.y_data_2)) if data is not None]
+        if not await self.prepare_views(columns, stats=True) or generation != self.summary_generation:
+            return
+        stats = {column: self.column_stats(column) for column in columns}
+        if None in stats.values():
+            return  # not indexed yet; plotting them updates the stats again
+
+        self.stats_container.clear()  # Clear any existing stats
 
         # Compute and display stats for the first Y-axis column
         if self.y_data_1 is not None:
-            stats_1 = self.compute_stats(self.y_data_1)
+            stats_1 = stats[y_column_1]
             with self.stats_container:
                 ui.label(f"Stats for {y_column_1}:").classes(
                     "text-lg font-semibold"
@@ -801,7 +1953,7 @@ class MainDataPage:
 
         # Compute and display stats for the second Y-axis column, if selected
         if self.y_data_2 is not None:
-            stats_2 = self.compute_stats(self.y_data_2)
+            stats_2 = stats[y_column_2]
             with self.stats_container:
                 ui.separator().props("color=dark, inset=False")
 
@@ -836,18 +1988,27 @@ class MainDataPage:
 
        
 
-    @staticmethod
-    def compute_stats(data):
-        """Compute basic statistics for a given data array."""
-        return {
-            "mean": np.mean(data),
-            "median": np.median(data),
-            "std": np.std(data),
-            "min": np.min(data),
-            "max": np.max(data),
-        }
-
-    def save_main_plot_as_jpg(self):
+    def column_stats(self, column):
+        """Summary stats of a whole column, or None until prepare_views has computed them.
+
+        Taken from the stream summary, running summary or column profile when there is one.
+        """
+        if self.stream_summary is not None:
+            return self.stream_summary.columns[column].stats(self.filter_zeros)
+        if self.following:
+            summary = self.tail_summaries.get(column)
+            return summary.stats(self.filter_zeros) if summary is not None else None
+        if (
+            self.column_profile is not None
+            and column in self.column_profile
+            and self.resample_settings() is None
+            and not self.config["stats"]["exact median"]
+        ):
+            # Profiled in the background when the file was opened, so nothing to compute; its median is sketched
+            return self.column_profile.stats(column, self.filter_zeros)
+        return self.stats_cache.get(self.stats_key(column))
+
+    async def save_main_plot_as_jpg(self):
         """Save the main plot as a .jpg image."""
       
         # Generate the filename using a timestamp
@@ -858,77 +2019,39 @@ class MainDataPage:
         path = self.config['save plots']['path']
         save_location = Path(path) / Path(filename)
 
-        fig = self.plot_figure
-
-        if self.bindings["box zoom"]:
-            fig.update_layout(
-            xaxis=dict(range=[self.range_start, self.range_end]))        
-        else:
+        # Ranges go on the exported copy; the live figure has to keep matching the screen
+        x_range = None
+        if self.range_start is not None and self.range_end is not None:
+            x_range = [self.range_start, self.range_end]
+        y_range = None
+        if not self.bindings["box zoom"]:
             new_data_y_1 = self.y_data_1[self.x_range_indices]
+            y_range = [new_data_y_1.min(), new_data_y_1.max()]
 
-            fig.update_layout(
-            xaxis=dict(range=[self.range_start, self.range_end]),
-            yaxis=dict(range=[min(new_data_y_1), max(new_data_y_1)]))
-          
-        # Save the figure as a .jpg
-        print(self.img_select.value)
-        fig.write_image(save_location, format=self.img_select.value.lower())
+        # Rendered by the warm kaleido browser; the UI stays responsive meanwhile
+        try:
+            # WebGL traces are exported as SVG ones so images look the same whichever mode is on screen
+            fig = static_figure(self.plot_figure, x_range, y_range)
+            await self.renderer.write_image(fig, save_location, self.img_select.value.lower())
+        except Exception as ex:
+            ui.notify(f"Error saving main plot: {ex}", color="red")
+            logger.error(f"Error saving main plot: {ex}")
+            return
 
         ui.notify(f"Main plot saved as {filename}", color="green")
         logger.info(f"Main plot saved as {filename}")
 
 
-    def save_histogram_as_jpg(self):
+    async def save_histogram_as_jpg(self):
         """Save the histogram plot as a .jpg image."""
         if self.dat_file_data is None or not self.bindings["graph rendered"]:
             ui.notify("No histogram to save!", color="red")
             return
 
         try:
-            # Retrieve histogram data
-            y_column_1 = self.gui_components["graph_dropdown"].value
-            y_column_2 = self.gui_components["second_graph_dropdown"].value
-
-            self.y_data_1 = self.dat_file_data[y_column_1].to_numpy()
-            self.y_data_2 = None
-            if (
-                y_column_2 != "Select Graph"
-                and y_column_2 in self.dat_file_data.columns
-            ):
-                self.y_data_2 = self.dat_file_data[y_column_2].to_numpy()
-
-            fig = go.Figure()
-
-            # Filter zeros if necessary
-            if self.filter_zeros:
-                self.y_data_1 = self.y_data_1[self.y_data_1 != 0]
-                if self.y_data_2 is not None:
-                    self.y_data_2 = self.y_data_2[self.y_data_2 != 0]
-
-            # Add histogram for the first Y-axis column
-            if self.y_data_1 is not None:
-                fig.add_trace(
-                    go.Histogram(
-                        x=self.y_data_1, name=f"Histogram of {y_column_1}", opacity=0.7
-                    )
-                )
-
-            # Add histogram for the second Y-axis column
-            if self.y_data_2 is not None:
-                fig.add_trace(
-                    go.Histogram(
-                        x=self.y_data_2, name=f"Histogram of {y_column_2}", opacity=0.7
-                    )
-                )
-
-            # Update layout
-            fig.update_layout(
-                template="plotly_dark",
-                title=f"Histogram of {y_column_1} and {y_column_2}",
-                xaxis_title="Y Values",
-                yaxis_title="Frequency",
-                barmode="overlay",
-            )
+            columns = [self.gui_components["graph_dropdown"].value, self.gui_components["second_graph_dropdown"].value]
+            await self.prepare_views(columns, histograms=True)
+            fig = self.build_histogram_figure()
 
             # Generate the filename using a timestamp
             import datetime
@@ -938,8 +2061,8 @@ class MainDataPage:
 
             path = self.config['save plots']['path']
             save_location = Path(path) / Path(filename)
-            # Save the figure as a .jpg
-            fig.write_image(save_location, format=self.img_select.value)
+            # Rendered by the warm kaleido browser; the UI stays responsive meanwhile
+            await self.renderer.write_image(fig, save_location, self.img_select.value.lower())
 
             ui.notify(f"Histogram saved as {filename}", color="green")
             logger.info(f"Histogram saved as {filename}")
@@ -948,6 +2071,25 @@ class MainDataPage:
             ui.notify(f"Error saving histogram: {ex}", color="red")
             logger.error(f"Error saving histogram: {ex}")
 
+    async def save_compare_plot(self):
+        """Save the Compare tab's overlay plot as an image."""
+        if self.compare_figure is None:
+            ui.notify("No comparison to save!", color="red")
+            return
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"compare_{timestamp}." + self.img_select.value
+        save_location = Path(self.config['save plots']['path']) / Path(filename)
+        try:
+            await self.renderer.write_image(self.compare_figure, save_location, self.img_select.value.lower())
+        except Exception as ex:
+            ui.notify(f"Error saving comparison: {ex}", color="red")
+            logger.error(f"Error saving comparison: {ex}")
+            return
+
+        ui.notify(f"Comparison saved as {filename}", color="green")
+        logger.info(f"Comparison saved as {filename}")
+
     def load_config_file(self):
         """Load user config from TOML file, or create it with defaults if missing."""
 
@@ -957,6 +2099,39 @@ class MainDataPage:
                 },
                 "save plots" : {
                     "path" : ""
+                },
+                "loading": {
+                    "lazy": True,
+                    "stream above mb": STREAM_ABOVE_MB,
+                    "compact columns": True
+                },
+                "cache": {
+                    "enabled": True,
+                    "max size mb": DEFAULT_MAX_MB
+                },
+                "stats": {
+                    "exact median": False
+                },
+                "histogram": {
+                    "bin rule": BIN_RULES[0],
+                    "bins": DEFAULT_BINS
+                },
+                "resample": {
+                    "rate": 0,
+                    "method": RESAMPLE_METHODS[0]
+                },
+                "plot": {
+                    "float32 traces": True,
+                    "render mode": "auto",
+                    "webgl above rows": WEBGL_ABOVE_ROWS
+                },
+                "profile": {
+                    "enabled": True,
+                    "sort by": SORT_ORDERS[0],
+                    "hide constant": True
+                },
+                "debug": {
+                    "trace": False
                 }
             }
 
@@ -974,6 +2149,10 @@ class MainDataPage:
                 logger.error(f"Failed to load config file: {ex}")
                 ui.notify("Error loading user config file", color="red")
 
+        if self.config["cache"]["enabled"]:
+            self.file_cache = FileCache(self.cache_dir, self.config["cache"]["max size mb"])
+        tracer.enabled = self.config["debug"]["trace"]
+
 
 def init_gui():
     page = MainDataPage()
@@ -986,6 +2165,7 @@ def init_gui():
     dark = ui.dark_mode()
     dark.enable()
 
+    app.on_shutdown(page.renderer.stop)
     app.on_shutdown(shutdown_handler)
 
     favicon = str(Path(__file__).parent / "favicon.ico")
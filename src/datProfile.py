@@ -0,0 +1,159 @@
+import json
+import math
+import os
+
+import numpy as np
+import polars as pl
+from loguru import logger
+
+from datStream import STREAM_SKETCH_CAPACITY, ColumnSummary
+
+
+# Bumped whenever the stored fields change, so older sidecar files are recomputed
+PROFILE_VERSION = 1
+
+# Orders the y-axis dropdowns can list columns in
+SORT_ORDERS = ["file", "name", "std", "range"]
+
+
+class ColumnProfiler:
+    """One column's profile accumulated batch by batch: a ColumnSummary, plus null counts and monotonic flags."""
+
+    def __init__(self) -> None:
+        self.summary = ColumnSummary(STREAM_SKETCH_CAPACITY)
+        self.rows = 0
+        self.nulls = 0
+        self.last = None
+        self.increasing = True
+        self.decreasing = True
+
+    def update(self, series):
+        """Fold a batch of the column (a polars Series) into the profile."""
+        self.rows += len(series)
+        self.nulls += series.null_count()
+        values = series.drop_nulls().cast(pl.Float64).to_numpy()
+        if len(values) == 0:
+            return
+        self.summary.update(values)
+        # Steps across batch boundaries count too
+        steps = np.diff(values, prepend=values[0] if self.last is None else self.last)
+        self.increasing = self.increasing and bool((steps >= 0).all())
+        self.decreasing = self.decreasing and bool((steps <= 0).all())
+        self.last = values[-1]
+
+    def profile(self):
+        """The column's entry in a FileProfile."""
+        stats = {key: float(value) for key, value in self.summary.stats().items()}
+        constant = self.rows == self.nulls or stats["min"] == stats["max"]
+        if constant:
+            monotonic = None
+        elif self.increasing:
+            monotonic = "increasing"
+        elif self.decreasing:
+            monotonic = "decreasing"
+        else:
+            monotonic = None
+        return {
+            "rows": self.rows,
+            "nulls": self.nulls,
+            "zeros": self.summary.all.count - self.summary.nonzero.count,
+            "constant": constant,
+            "monotonic": monotonic,
+            "stats": stats,
+            "nonzero stats": {key: float(value) for key, value in self.summary.stats(drop_zeros=True).items()},
+        }
+
+
+def profile_columns(dat_file, columns, progress=None, cancel=None):
+    """Profile columns of dat_file in one pass over its batches, without loading them into it.
+
+    Stats come from the same accumulators as a streamed file's summary (see
+    datStream.summarize), and the batches are read from the file's cached
+    Arrow copy when it has one. Returns a FileProfile. progress and cancel
+    work as in DatFile.iter_batches.
+    """
+    profilers = {column: ColumnProfiler() for column in columns}
+    for frame in dat_file.iter_batches(columns, progress=progress, cancel=cancel):
+        for column, profiler in profilers.items():
+            profiler.update(frame[column])
+    return FileProfile({column: profiler.profile() for column, profiler in profilers.items()})
+
+
+class FileProfile:
+    """Per-column profile of a file: stats, null and zero counts, and constant and monotonic flags.
+
+    Built once in the background by profile_columns and kept as a small JSON
+    sidecar next to the file's cache entry, so reopening the file gets it back
+    without touching the data.
+    """
+
+    def __init__(self, columns) -> None:
+        self.columns = columns
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def stats(self, column, drop_zeros=False):
+        """Mean, median, std, min and max of a whole column, in the same form as fused_stats."""
+        return dict(self.columns[column]["nonzero stats" if drop_zeros else "stats"])
+
+    def is_constant(self, column):
+        return column in self.columns and self.columns[column]["constant"]
+
+    def order(self, columns, sort_by="file", hide_constant=True):
+        """columns in the given SORT_ORDERS order, leaving out constant ones if hide_constant is set.
+
+        Columns without a profile are kept, after the profiled ones when sorting by a stat.
+        """
+        if hide_constant:
+            columns = [column for column in columns if not self.is_constant(column)]
+        if sort_by == "name":
+            return sorted(columns, key=str.lower)
+        if sort_by in ("std", "range"):
+            def spread(column):
+                if column not in self.columns:
+                    return math.inf
+                stats = self.columns[column]["stats"]
+                value = stats["std"] if sort_by == "std" else stats["max"] - stats["min"]
+                # Largest first; NaN (no values) last
+                return math.inf if math.isnan(value) else -value
+            return sorted(columns, key=spread)
+        return list(columns)
+
+    def label(self, column):
+        """Dropdown text for a column: its name, range, and any zero, null or monotonic notes."""
+        if column not in self.columns:
+            return column
+        profile = self.columns[column]
+        stats = profile["stats"]
+        notes = [f"{stats['min']:.4g} to {stats['max']:.4g}"]
+        if profile["monotonic"]:
+            notes.append(profile["monotonic"])
+        if profile["zeros"]:
+            share = profile["zeros"] / profile["rows"]
+            notes.append(f"{share:.0%} zeros" if share >= 0.01 else f"{profile['zeros']} zeros")
+        if profile["nulls"]:
+            notes.append(f"{profile['nulls']} nulls")
+        if profile["constant"]:
+            notes.append("constant")
+        return f"{column} ({', '.join(notes)})"
+
+    def save(self, path):
+        """Write the profile as JSON to path, replacing it atomically."""
+        temp = f"{path}.tmp"
+        with open(temp, "w") as file:
+            json.dump({"version": PROFILE_VERSION, "columns": self.columns}, file)
+        os.replace(temp, path)
+        logger.info(f"Saved column profile to {path}")
+
+    @classmethod
+    def load(cls, path):
+        """Read a profile written by save(), or None if there is no usable one at path."""
+        try:
+            with open(path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != PROFILE_VERSION:
+            return None
+        return cls(data["columns"])
@@ -0,0 +1,189 @@
+import numpy as np
+
+
+# Levels below this block size are not stored; queries read the raw samples
+# instead. Each node keeps its argmin and argmax (int32 for columns under 2**31
+# rows) and a float64 sum and m2, 24 bytes per 8 samples at the leaf level, so
+# all levels together take about 6 bytes per sample.
+LEAF_BITS = 3
+
+
+class ColumnPyramid:
+    """Min/max/sum/count summaries of one column at power-of-two block sizes.
+
+    Level k holds one node per block of 2**k consecutive samples. Any index range
+    can be covered by O(log n) nodes, so range statistics and downsampled views
+    don't need to rescan the column. A node's min and max are read from the
+    column at its argmin and argmax rather than stored.
+    """
+
+    def __init__(self, data) -> None:
+        self.data = np.asarray(data)
+        self.n = len(self.data)
+        self.levels: dict = {}
+        self._build()
+
+    def _build(self):
+        values = self.data.astype(np.float64, copy=False)
+        block = 1 << LEAF_BITS
+        n_full = (self.n // block) * block
+        index = np.int32 if self.n < 2**31 else np.int64
+        starts = np.arange(0, self.n, block, dtype=index)
+
+        # Leaf level straight from the raw samples
+        blocks = values[:n_full].reshape(-1, block)
+        level = {
+            "sum": blocks.sum(axis=1),
+            "argmin": blocks.argmin(axis=1).astype(index) + starts[: len(blocks)],
+            "argmax": blocks.argmax(axis=1).astype(index) + starts[: len(blocks)],
+        }
+        level["m2"] = ((blocks - (level["sum"] / block)[:, None]) ** 2).sum(axis=1)
+
+        if n_full < self.n:
+            tail = values[n_full:]
+            level["sum"] = np.append(level["sum"], tail.sum())
+            level["argmin"] = np.append(level["argmin"], index(tail.argmin() + n_full))
+            level["argmax"] = np.append(level["argmax"], index(tail.argmax() + n_full))
+            level["m2"] = np.append(level["m2"], ((tail - tail.mean()) ** 2).sum())
+
+        bits = LEAF_BITS
+        self.levels[bits] = level
+        while len(level["sum"]) > 1:
+            level = self._combine(level, bits)
+            bits += 1
+            self.levels[bits] = level
+
+    def _combine(self, level, bits):
+        """Merge adjacent node pairs of a level into the next level up."""
+        size = len(level["sum"])
+        even = size - size % 2
+        left = slice(0, even, 2)
+        right = slice(1, even, 2)
+
+        counts = self.counts(bits)
+        n_a = counts[left]
+        n_b = counts[right]
+        delta = level["sum"][right] / n_b - level["sum"][left] / n_a
+
+        low = self.data[level["argmin"]]
+        high = self.data[level["argmax"]]
+        take_left_min = low[left] <= low[right]
+        take_left_max = high[left] >= high[right]
+        merged = {
+            "sum": level["sum"][left] + level["sum"][right],
+            "argmin": np.where(take_left_min, level["argmin"][left], level["argmin"][right]),
+            "argmax": np.where(take_left_max, level["argmax"][left], level["argmax"][right]),
+            "m2": level["m2"][left] + level["m2"][right] + delta**2 * n_a * n_b / (n_a + n_b),
+        }
+
+        # An odd node at the end carries up unchanged
+        if even < size:
+            for key in merged:
+                merged[key] = np.append(merged[key], level[key][-1])
+        return merged
+
+    def counts(self, bits):
+        """Number of samples covered by each node on a level."""
+        size = 1 << bits
+        starts = np.arange(len(self.levels[bits]["sum"])) * size
+        return np.minimum(size, self.n - starts)
+
+    def _cover(self, lo, hi):
+        """Split [lo, hi) into raw edge slices plus the pyramid nodes covering the middle."""
+        block = 1 << LEAF_BITS
+        first = min(-(-lo // block) * block, hi)
+        last = max((hi // block) * block, first)
+        left = first >> LEAF_BITS
+        right = last >> LEAF_BITS
+        if hi == self.n and last < hi:
+            # The final partial block is a stored node
+            last = hi
+            right += 1
+
+        raw = [slice(lo, first), slice(last, hi)]
+        nodes = []
+        bits = LEAF_BITS
+        while left < right:
+            if left & 1:
+                nodes.append((bits, left))
+                left += 1
+            if right & 1:
+                right -= 1
+                nodes.append((bits, right))
+            left >>= 1
+            right >>= 1
+            bits += 1
+        return raw, nodes
+
+    def range_stats(self, lo, hi):
+        """Mean, std, min, max and count of samples [lo, hi) in O(log n)."""
+        lo = max(int(lo), 0)
+        hi = min(int(hi), self.n)
+        if hi <= lo:
+            return None
+
+        raw, nodes = self._cover(lo, hi)
+        parts = []
+        for part in raw:
+            values = self.data[part].astype(np.float64, copy=False)
+            if len(values):
+                parts.append(
+                    (len(values), values.sum(), ((values - values.mean()) ** 2).sum(), values.min(), values.max())
+                )
+        for bits, i in nodes:
+            level = self.levels[bits]
+            count = min(1 << bits, self.n - (i << bits))
+            low, high = self.data[level["argmin"][i]], self.data[level["argmax"][i]]
+            parts.append((count, level["sum"][i], level["m2"][i], low, high))
+
+        # Chan et al. pairwise merge of the partial results
+        count, total, m2, low, high = parts[0]
+        for n_b, sum_b, m2_b, min_b, max_b in parts[1:]:
+            delta = sum_b / n_b - total / count
+            m2 = m2 + m2_b + delta**2 * count * n_b / (count + n_b)
+            count += n_b
+            total += sum_b
+            low = min(low, min_b)
+            high = max(high, max_b)
+
+        return {
+            "mean": total / count,
+            "std": np.sqrt(m2 / count),
+            "min": low,
+            "max": high,
+            "count": count,
+        }
+
+    def minmax_indices(self, lo, hi, max_points):
+        """Indices of each block's min and max for [lo, hi), at the finest level that fits max_points."""
+        lo = max(int(lo), 0)
+        hi = min(int(hi), self.n)
+        if hi - lo <= max_points:
+            return np.arange(lo, hi)
+
+        n_buckets = max(max_points // 2, 1)
+        bits = LEAF_BITS
+        while ((hi - lo) >> bits) > n_buckets and bits + 1 in self.levels:
+            bits += 1
+
+        level = self.levels[bits]
+        size = 1 << bits
+        first = lo >> bits
+        last = -(-hi // size)
+        i_min = level["argmin"][first:last].copy()
+        i_max = level["argmax"][first:last].copy()
+
+        # A block cut by the window edge may have its extremes outside the window,
+        # so its part inside is scanned raw instead, as _cover does for range_stats
+        for i, block in ((0, first), (-1, last - 1)):
+            start, end = max(block * size, lo), min(block * size + size, hi)
+            if start > block * size or end < min(block * size + size, self.n):
+                part = self.data[start:end]
+                i_min[i] = start + part.argmin()
+                i_max[i] = start + part.argmax()
+
+        indices = np.empty(2 * len(i_min), dtype=np.int64)
+        indices[0::2] = np.minimum(i_min, i_max)
+        indices[1::2] = np.maximum(i_min, i_max)
+        indices = np.concatenate(([lo], indices, [hi - 1]))
+        return np.unique(indices[(indices >= lo) & (indices < hi)])
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+
+import kaleido
+from kaleido.errors import ChromeNotFoundError
+from loguru import logger
+
+
+# Seconds one image may take before the browser is presumed hung and restarted
+RENDER_TIMEOUT = 60
+
+
+class ImageRenderer:
+    """A kaleido browser kept open on its own thread, so saves don't each pay Chromium startup.
+
+    The thread, its event loop and the browser are started by the first job.
+    Jobs queue up on that loop and are rendered one at a time. submit() returns
+    a concurrent future straight away and write_image() can be awaited from
+    the GUI's event loop. If the browser dies or a render hangs, the browser is
+    discarded and the job is retried once on a fresh one.
+    """
+
+    def __init__(self, timeout=RENDER_TIMEOUT) -> None:
+        self.timeout = timeout
+        self._loop = None
+        self._thread = None
+        self._kaleido = None
+        self._job_lock = None  # asyncio.Lock, created on the renderer's loop
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            ready = threading.Event()
+
+            def run():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                self._job_lock = asyncio.Lock()
+                ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name="image-renderer", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def submit(self, fig, path, image_format, width=None, height=None, scale=None):
+        """Queue fig to be written to path. Returns a concurrent.futures.Future of the path."""
+        self._ensure_started()
+        # Snapshot the figure now so later edits to it can't race the render
+        spec = fig.to_dict() if hasattr(fig, "to_dict") else fig
+        opts = {"format": image_format, "width": width, "height": height, "scale": scale}
+        opts = {key: value for key, value in opts.items() if value is not None}
+        return asyncio.run_coroutine_threadsafe(self._render(spec, str(path), opts), self._loop)
+
+    async def write_image(self, fig, path, image_format, **kwargs):
+        """Render fig to path without blocking the calling event loop."""
+        return await asyncio.wrap_future(self.submit(fig, path, image_format, **kwargs))
+
+    async def _render(self, spec, path, opts):
+        async with self._job_lock:
+            for attempt in range(2):
+                try:
+                    if self._kaleido is None:
+                        self._kaleido = kaleido.Kaleido(n=1, timeout=self.timeout)
+                        await self._kaleido.open()
+                        logger.info("Image renderer started")
+
+                    # Plotly errors land in errors; anything raised is the browser itself failing
+                    errors: list = []
+                    await asyncio.wait_for(
+                        self._kaleido.write_fig(spec, path=path, opts=opts, error_log=errors), self.timeout
+                    )
+                    if errors:
+                        raise ValueError(str(errors[0]))
+                    return path
+                except (ValueError, ChromeNotFoundError):
+                    raise
+                except Exception as ex:
+                    await self._close_browser()
+                    if attempt:
+                        raise
+                    logger.warning(f"Image renderer failed ({ex!r}), restarting it")
+
+    async def _close_browser(self):
+        if self._kaleido is None:
+            return
+        browser, self._kaleido = self._kaleido, None
+        try:
+            await browser.close()
+        except Exception as ex:
+            logger.debug(f"Error closing image renderer: {ex!r}")
+
+    def stop(self):
+        """Close the browser and stop the renderer's thread, if they were started."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_browser(), self._loop).result(timeout=10)
+        except Exception as ex:
+            logger.debug(f"Error stopping image renderer: {ex!r}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._thread = None
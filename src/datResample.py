@@ -0,0 +1,106 @@
+import numpy as np
+from loguru import logger
+
+from datAxis import XAxisIndex
+
+
+RESAMPLE_METHODS = ["interpolate", "mean"]
+
+# A gap between samples this many times the file's usual spacing is a dropout.
+# Grid points that fall inside one are left out rather than invented.
+DROPOUT_FACTOR = 4
+
+# Cap on grid points, as in datOverlay.MAX_GRID_POINTS. A rate that would need
+# more (e.g. 1e6 per second over a two hour run) is lowered to fit rather than
+# allocating billions of points; the rate is kept in the config, so it would
+# otherwise fail again on every open.
+MAX_GRID_POINTS = 10_000_000
+
+
+class Resampler:
+    """Regrids columns sampled against x onto a uniform time base of rate points per x unit.
+
+    Everything that depends only on x is worked out once: sorting, placing the
+    grid, and either each grid point's neighbouring samples ("interpolate") or
+    each sample's grid bin ("mean", the average of the samples in each bin).
+    Resampling a column is then a couple of vectorized gathers over it.
+
+    Grid points inside dropouts, or bins with no samples, are dropped, so the
+    grid stays evenly spaced apart from those holes and every value is finite.
+
+    The grid is origin + k * step for whole k, starting at x's first sample
+    unless another origin is given; resamplers built with the same origin and
+    rate put other files' samples on exactly the same x values.
+    """
+
+    def __init__(
+        self, x, rate, method="interpolate", dropout_factor=DROPOUT_FACTOR, max_points=MAX_GRID_POINTS, origin=None
+    ) -> None:
+        index = XAxisIndex(x)
+        self.order = None if index.is_sorted else index.order
+        self.rate = rate
+        self.method = method
+        xs = index.sorted_x.astype(np.float64)
+        self.n = len(xs)
+        self.origin = xs[0] if origin is None and self.n else origin
+
+        if self.n < 2:
+            self.grid = xs.copy()
+            self._gather = np.arange(self.n)
+            return
+
+        step = 1 / rate
+        first, points = self.grid_span(xs, step)
+        if points > max_points:
+            # Coarsened by a whole factor, so the grid keeps to the origin's
+            factor = int(np.ceil(points / max_points))
+            self.rate = rate / factor
+            step = 1 / self.rate
+            first, points = self.grid_span(xs, step)
+            logger.warning(f"Resample rate {rate:g} needs too many grid points; using {self.rate:g} instead")
+        grid = self.origin + (first + np.arange(points)) * step
+
+        if method == "mean":
+            bins = np.minimum(np.maximum(((xs - grid[0]) / step).astype(np.int64), 0), points - 1)
+            counts = np.bincount(bins, minlength=points)
+            self._keep = counts > 0
+            self._bins = bins
+            self._counts = counts[self._keep]
+            self.grid = grid[self._keep]
+            return
+
+        spacing = np.diff(xs)
+        max_gap = max(dropout_factor * np.median(spacing), step)
+
+        right = np.clip(np.searchsorted(xs, grid, side="left"), 1, self.n - 1)
+        gap = spacing[right - 1]
+        keep = gap <= max_gap
+        self._left = right[keep] - 1
+        self._weight = np.divide(
+            grid[keep] - xs[self._left], gap[keep], out=np.zeros(int(keep.sum())), where=gap[keep] > 0
+        )
+        self.grid = grid[keep]
+
+    def grid_span(self, xs, step):
+        """First grid index and number of grid points covering sorted xs.
+
+        "mean" bins start at the grid point at or before xs[0]; interpolation
+        starts at or after it, so nothing is extrapolated.
+        """
+        start = (xs[0] - self.origin) / step
+        first = int(np.floor(start) if self.method == "mean" else np.ceil(start))
+        return first, int(np.floor((xs[-1] - self.origin) / step)) - first + 1
+
+    def resample(self, y):
+        """Values of y, sampled against the x this was built from, on self.grid."""
+        y = np.asarray(y)
+        if self.order is not None:
+            y = y[self.order]
+        if self.n < 2:
+            return y.astype(np.float64)
+        if self.method == "mean":
+            sums = np.bincount(self._bins, weights=y, minlength=len(self._keep))
+            return sums[self._keep] / self._counts
+
+        left = y[self._left].astype(np.float64)
+        return left + self._weight * (y[self._left + 1] - left)
@@ -0,0 +1,170 @@
+import numpy as np
+
+
+# Chunks this size stay in cache while the per-chunk reductions run over them
+STATS_CHUNK = 1 << 16
+
+# Number of values kept by QuantileSketch. It is a uniform random sample, so a
+# quantile's rank is off by about 0.5 / sqrt of this (0.2% of the rows) on average.
+SKETCH_CAPACITY = 1 << 16
+
+
+class RunningStats:
+    """Count, mean, variance, min and max accumulated chunk by chunk.
+
+    Chunks are combined with the parallel form of Welford's update (Chan et al.),
+    so accumulators over different parts of a column can also be merged.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, chunk):
+        """Fold a chunk of values into the running totals."""
+        if len(chunk) == 0:
+            return
+        chunk = np.asarray(chunk, dtype=np.float64)
+        other = RunningStats()
+        other.count = len(chunk)
+        other.mean = chunk.sum() / other.count
+        other.m2 = np.square(chunk - other.mean).sum()
+        other.min = chunk.min()
+        other.max = chunk.max()
+        self.merge(other)
+
+    def merge(self, other):
+        """Combine another accumulator into this one."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else np.nan
+
+
+class QuantileSketch:
+    """Uniform random sample of a stream for approximate quantiles.
+
+    Every value gets a random key and the capacity values with the smallest
+    keys are kept (bottom-k sampling). That is a uniform sample whatever order
+    the values come in, so periodic data can't bias it the way a fixed stride
+    would. Two sketches merge by keeping the smallest keys of both, and memory
+    stays bounded however long the stream is.
+    """
+
+    def __init__(self, capacity=SKETCH_CAPACITY, seed=None) -> None:
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.seen = 0
+        self.parts: list = []  # (keys, values) pairs, trimmed to capacity once they hold twice that
+        self.size = 0
+        self.threshold = np.inf  # largest key kept once the sample is full; larger keys can't get in
+
+    def update(self, chunk):
+        """Sample a chunk of values that follows on from the ones already seen."""
+        chunk = np.asarray(chunk)
+        keys = self.rng.random(len(chunk), dtype=np.float32)
+        keep = keys < self.threshold
+        # Indexing copies, so the sketch doesn't keep whole chunks alive
+        self._add(keys[keep], chunk[keep])
+        self.seen += len(chunk)
+
+    def merge(self, other):
+        """Combine another sketch into this one, keeping the smallest keys of both."""
+        keys, values = other._trimmed()
+        keep = keys < self.threshold
+        self._add(keys[keep], values[keep])
+        self.seen += other.seen
+
+    def _add(self, keys, values):
+        self.parts.append((keys, values))
+        self.size += len(keys)
+        if self.size > 2 * self.capacity:
+            self._trimmed()
+
+    def _trimmed(self):
+        """The kept keys and values, cut down to the capacity smallest keys."""
+        if len(self.parts) != 1:
+            if self.parts:
+                keys = np.concatenate([keys for keys, _ in self.parts])
+                values = np.concatenate([values for _, values in self.parts])
+            else:
+                keys, values = np.empty(0, dtype=np.float32), np.empty(0)
+            self.parts = [(keys, values)]
+        keys, values = self.parts[0]
+        if len(keys) > self.capacity:
+            kept = np.argpartition(keys, self.capacity - 1)[: self.capacity]
+            keys, values = keys[kept], values[kept]
+            self.parts = [(keys, values)]
+            self.size = len(keys)
+        if len(keys) == self.capacity:
+            self.threshold = keys.max()
+        return keys, values
+
+    def sample(self):
+        return self._trimmed()[1]
+
+    def quantile(self, q):
+        sample = self.sample()
+        return np.quantile(sample, q) if len(sample) else np.nan
+
+
+def median(data, exact_median=False, mask=None):
+    """Median of data, estimated from a random sample like QuantileSketch's unless exact_median is set.
+
+    If a boolean mask is given only the values where it is True are counted.
+    """
+    if exact_median:
+        return np.median(data if mask is None else data[mask])
+    if len(data) == 0:
+        return np.nan
+    if len(data) > SKETCH_CAPACITY:
+        # As many random rows as the sketch keeps, taken in one step
+        rows = np.random.default_rng().integers(0, len(data), SKETCH_CAPACITY)
+        data, mask = data[rows], None if mask is None else mask[rows]
+    sample = data if mask is None else data[mask]
+    return np.median(sample) if len(sample) else np.nan
+
+
+def fused_stats(data, exact_median=False, chunk=STATS_CHUNK, mask=None):
+    """Mean, median, std, min and max of data in a single pass over memory.
+
+    The median is estimated from a QuantileSketch sample unless exact_median is
+    set, in which case it needs a full partition of a copy of the data.
+    A boolean mask restricts the stats to the values where it is True, filtering
+    chunk by chunk rather than copying the whole column.
+    """
+    data = np.asarray(data)
+    stats = RunningStats()
+    sketch = None if exact_median else QuantileSketch()
+    for start in range(0, len(data), chunk):
+        part = data[start : start + chunk]
+        if mask is not None:
+            part = part[mask[start : start + chunk]]
+        stats.update(part)
+        if sketch is not None:
+            sketch.update(part)
+
+    return {
+        "mean": stats.mean if stats.count else np.nan,
+        "median": median(data, True, mask) if exact_median else sketch.quantile(0.5),
+        "std": stats.std,
+        "min": stats.min if stats.count else np.nan,
+        "max": stats.max if stats.count else np.nan,
+    }
@@ -0,0 +1,129 @@
+import numpy as np
+
+from datDecimate import DEFAULT_MAX_POINTS, minmax_indices
+from datHistogram import StreamingHistogram
+from datStats import SKETCH_CAPACITY, QuantileSketch, RunningStats
+
+
+# Values kept per quantile sketch when summarizing a streamed file. Each column
+# has two (all and nonzero values), each value with a 4-byte key, so at the
+# default SKETCH_CAPACITY a 2000-column file would hold about 3 GB of samples;
+# at this size it is about 200 MB, alongside 32 KB of histogram counts per column.
+STREAM_SKETCH_CAPACITY = 4096
+
+
+class ColumnSummary:
+    """Stats and a histogram of one column, accumulated batch by batch.
+
+    Each accumulator is mergeable and bounded in size, so a column of any
+    length is summarized in constant memory. Zero-filtered stats are kept
+    alongside so the zero toggle needs no second pass.
+    """
+
+    def __init__(self, sketch_capacity=SKETCH_CAPACITY) -> None:
+        self.all = RunningStats()
+        self.all_sketch = QuantileSketch(sketch_capacity)
+        self.nonzero = RunningStats()
+        self.nonzero_sketch = QuantileSketch(sketch_capacity)
+        self.histogram = StreamingHistogram()
+
+    def update(self, chunk):
+        """Fold a batch of the column's values into the summary."""
+        self.all.update(chunk)
+        self.all_sketch.update(chunk)
+        nonzero = chunk[chunk != 0]
+        self.nonzero.update(nonzero)
+        self.nonzero_sketch.update(nonzero)
+        self.histogram.update(chunk)
+
+    def merge(self, other):
+        """Combine the summary of another part of the column into this one."""
+        self.all.merge(other.all)
+        self.all_sketch.merge(other.all_sketch)
+        self.nonzero.merge(other.nonzero)
+        self.nonzero_sketch.merge(other.nonzero_sketch)
+        self.histogram.merge(other.histogram)
+
+    def stats(self, drop_zeros=False):
+        """Mean, median, std, min and max, in the same form as fused_stats."""
+        stats, sketch = (self.nonzero, self.nonzero_sketch) if drop_zeros else (self.all, self.all_sketch)
+        return {
+            "mean": stats.mean if stats.count else np.nan,
+            "median": sketch.quantile(0.5),
+            "std": stats.std,
+            "min": stats.min if stats.count else np.nan,
+            "max": stats.max if stats.count else np.nan,
+        }
+
+
+class Overview:
+    """A min/max decimated copy of one column against x, built batch by batch.
+
+    Every batch is cut into buckets of a fixed number of rows, sized from the
+    file's estimated row count, and each bucket keeps its min and max. The
+    result is about max_points samples whatever the file size.
+    """
+
+    def __init__(self, estimated_rows, max_points=DEFAULT_MAX_POINTS) -> None:
+        self.bucket = max(int(np.ceil(estimated_rows / max(max_points // 2, 1))), 1)
+        self._x: list = []
+        self._y: list = []
+
+    def update(self, x, y):
+        """Decimate a batch of x/y and keep the samples."""
+        if len(y) == 0:
+            return
+        indices = minmax_indices(y, 2 * int(np.ceil(len(y) / self.bucket)))
+        self._x.append(x[indices])
+        self._y.append(y[indices])
+
+    def xy(self):
+        if not self._y:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(self._x), np.concatenate(self._y)
+
+
+class StreamSummary:
+    """Everything the GUI shows for a file too large to load: per-column summaries and overviews.
+
+    overviews[x_column][column] is an Overview of column against x_column, and
+    x_ranges[x_column] is that column's (min, max).
+    """
+
+    def __init__(self) -> None:
+        self.columns: dict = {}
+        self.overviews: dict = {}
+        self.x_ranges: dict = {}
+
+
+def summarize(dat_file, columns, x_columns, max_points=DEFAULT_MAX_POINTS, stats=True, progress=None, cancel=None, summary=None):
+    """Summarize columns of dat_file in one pass over its batches, without holding the file in memory.
+
+    Every column gets a ColumnSummary (unless stats is False) and an Overview
+    against each of x_columns. Passing an existing summary adds to it, e.g. to
+    build overviews against a newly chosen x column. progress and cancel work
+    as in read_text_columns.
+    """
+    summary = summary if summary is not None else StreamSummary()
+    rows = dat_file.estimated_rows()
+    needed = list(dict.fromkeys([*x_columns, *columns]))
+    if stats:
+        for column in columns:
+            summary.columns[column] = ColumnSummary(STREAM_SKETCH_CAPACITY)
+    for x_column in x_columns:
+        summary.overviews[x_column] = {column: Overview(rows, max_points) for column in columns}
+    x_stats = {x_column: RunningStats() for x_column in x_columns}
+
+    for frame in dat_file.iter_batches(needed, progress=progress, cancel=cancel):
+        data = {column: frame[column].to_numpy() for column in needed}
+        if stats:
+            for column in columns:
+                summary.columns[column].update(data[column])
+        for x_column in x_columns:
+            x_stats[x_column].update(data[x_column])
+            for column in columns:
+                summary.overviews[x_column][column].update(data[x_column], data[column])
+
+    for x_column, x_range in x_stats.items():
+        summary.x_ranges[x_column] = (float(x_range.min), float(x_range.max)) if x_range.count else (None, None)
+    return summary
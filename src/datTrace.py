@@ -0,0 +1,113 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from loguru import logger
+
+
+# Spans kept for a trace dump; older ones are dropped so a long session stays bounded
+MAX_EVENTS = 100_000
+
+
+class Tracer:
+    """Timed spans around the GUI's hot paths, for finding where an interaction's time goes.
+
+    span() times one stage and interaction() one user action, such as opening a
+    file or zooming, made of stages. Spans are logged at debug level, and each
+    interaction logs its total and breakdown when it ends and is passed to the
+    listeners (the on-screen overlay). dump() writes the kept spans as a Chrome
+    trace for chrome://tracing or Perfetto.
+
+    Both yield a dict of details for the span, e.g. payload bytes, which ends up
+    in its log line and trace event. While disabled they do nothing.
+    """
+
+    def __init__(self, enabled=False, max_events=MAX_EVENTS) -> None:
+        self.enabled = enabled
+        self.events: deque = deque(maxlen=max_events)
+        self.listeners: list = []  # called with (name, total_ms, spans) as each interaction ends
+        # Spans of the interaction in progress, as (name, ms, details). Per context, so
+        # async handlers that overlap each collect their own spans
+        self._current = contextvars.ContextVar("trace_interaction", default=None)
+        self._origin = time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, name, **details):
+        if not self.enabled:
+            yield details
+            return
+
+        start = time.perf_counter_ns()
+        try:
+            yield details
+        finally:
+            duration = time.perf_counter_ns() - start
+            self.events.append({
+                "name": name,
+                "ph": "X",  # complete event: a start and a duration
+                "ts": (start - self._origin) / 1000,
+                "dur": duration / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": details,
+            })
+            logger.debug(f"{name}: {duration / 1e6:.1f} ms {details or ''}")
+            current = self._current.get()
+            if current is not None:
+                current.append((name, duration / 1e6, details))
+
+    @contextmanager
+    def interaction(self, name, **details):
+        """A span for a whole user action. Nested inside another interaction it is just a span."""
+        if not self.enabled or self._current.get() is not None:
+            with self.span(name, **details) as span:
+                yield span
+            return
+
+        spans = []
+        token = self._current.set(spans)
+        start = time.perf_counter_ns()
+        try:
+            with self.span(name, **details) as span:
+                yield span
+        finally:
+            self._current.reset(token)
+            total = (time.perf_counter_ns() - start) / 1e6
+            stages = [stage for stage in spans if stage[0] != name]
+            breakdown = ", ".join(f"{stage} {ms:.1f} ms" for stage, ms, _ in stages)
+            logger.info(f"{name} took {total:.1f} ms ({breakdown})")
+            for listener in self.listeners:
+                listener(name, total, stages)
+
+    def dump(self, path):
+        """Write the kept spans to path in Chrome trace format."""
+        with open(path, "w") as file:
+            json.dump({"traceEvents": list(self.events), "displayTimeUnit": "ms"}, file)
+        logger.info(f"Wrote {len(self.events)} trace events to {path}")
+
+
+# Shared by every module, so spans from anywhere land in the same trace
+tracer = Tracer()
+
+
+def traced(name):
+    """Decorator that runs a function, plain or async, as a tracer interaction called name."""
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with tracer.interaction(name):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with tracer.interaction(name):
+                    return func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,78 @@
+import base64
+
+import numpy as np
+
+
+# A float64 array is sent as float32 only if no value moves by more than this
+# fraction of the array's span, far below a pixel on any screen
+FLOAT32_TOLERANCE = 1e-6
+
+# numpy dtypes plotly.js can rebuild from a typed array spec
+TYPED_DTYPES = {"f8", "f4", "i4", "i2", "i1", "u4", "u2", "u1"}
+
+# Client-side counterpart of encode_arrays, added to the page once. Plotly decodes
+# typed array specs itself in newPlot and restyle but not in extendTraces, so
+# arguments are decoded into typed arrays before any Plotly call.
+DECODE_SCRIPT = """
+<script>
+window.decodeTypedArrays = function decode(value) {
+    if (Array.isArray(value)) return value.map(decode);
+    if (value === null || typeof value !== "object") return value;
+    if (typeof value.bdata === "string" && typeof value.dtype === "string") {
+        const types = {f8: Float64Array, f4: Float32Array, i4: Int32Array, i2: Int16Array, i1: Int8Array,
+                       u4: Uint32Array, u2: Uint16Array, u1: Uint8Array};
+        const bytes = Uint8Array.from(atob(value.bdata), (c) => c.charCodeAt(0));
+        return new types[value.dtype](bytes.buffer);
+    }
+    return Object.fromEntries(Object.entries(value).map(([key, item]) => [key, decode(item)]));
+};
+</script>
+"""
+
+
+def compact_array(values, tolerance=FLOAT32_TOLERANCE):
+    """values as float32 if that keeps every value within tolerance of their span, else values unchanged."""
+    values = np.asarray(values)
+    if values.dtype != np.float64 or len(values) == 0:
+        return values
+    with np.errstate(over="ignore"):
+        # Overflow to inf makes the error inf, so out-of-range values stay float64
+        single = values.astype(np.float32)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return single
+    kept = values[finite]
+    error = np.abs(single[finite].astype(np.float64) - kept).max()
+    # Against the span, since that is what the axis stretches across the screen; a flat line has none
+    scale = np.ptp(kept) or np.abs(kept).max()
+    return single if error <= tolerance * scale else values
+
+
+def typed_array(values, downcast=False):
+    """A plotly.js typed array spec ({dtype, bdata}) for a 1-d numeric array.
+
+    The base64 is encoded straight from the array's buffer, with no copy
+    when it is already contiguous. With downcast set, float64 arrays go
+    through compact_array first.
+    """
+    values = np.asarray(values)
+    if downcast:
+        values = compact_array(values)
+    if values.dtype == np.int64:
+        # plotly.js has no 64-bit integer arrays
+        values = values.astype(np.float64)
+    dtype = values.dtype.str[1:]
+    if dtype not in TYPED_DTYPES or values.dtype.byteorder == ">":
+        return values.tolist()
+    return {"dtype": dtype, "bdata": base64.b64encode(np.ascontiguousarray(values)).decode("ascii")}
+
+
+def encode_arrays(value, downcast=False):
+    """A copy of a Plotly call argument with every numpy array in it replaced by a typed array spec."""
+    if isinstance(value, np.ndarray):
+        return typed_array(value, downcast)
+    if isinstance(value, dict):
+        return {key: encode_arrays(item, downcast) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_arrays(item, downcast) for item in value]
+    return value
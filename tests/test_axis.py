@@ -0,0 +1,22 @@
+import numpy as np
+
+from datAxis import XAxisIndex
+
+
+def test_sorted_x_windows_are_slices():
+    index = XAxisIndex(np.arange(10.0))
+    assert index.is_sorted
+    assert index.window(2.5, 6) == slice(3, 7)
+    assert index.row_span(2.5, 6) == (3, 7)
+    assert index.row_span(20, 30) is None
+
+
+def test_unsorted_x_uses_the_sorting_permutation():
+    x = np.array([3.0, 1.0, 4.0, 1.5, 9.0, 2.0])
+    index = XAxisIndex(x)
+    assert not index.is_sorted
+    np.testing.assert_array_equal(index.sorted_x, np.sort(x))
+    rows = index.window(1.2, 3.5)
+    assert sorted(x[rows]) == [1.5, 2.0, 3.0]
+    assert index.row_span(1.2, 3.5) == (0, 6)
+    assert index.row_span(3.5, 4.5) == (2, 3)
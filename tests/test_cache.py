@@ -0,0 +1,75 @@
+import os
+
+from datCache import FileCache, LRUCache
+from datLoader import DatFile
+
+
+def write_dat(path, value):
+    path.write_text(f"t speed\n0.0 {value}\n0.1 {value}\n")
+    return path
+
+
+def test_store_and_lookup(tmp_path):
+    cache = FileCache(tmp_path / "cache")
+    path = write_dat(tmp_path / "run.dat", 1.5)
+    assert cache.lookup(path) is None
+    cache.store(path, DatFile(path).scan)
+    entry = cache.lookup(path)
+    assert entry is not None and entry.exists()
+    assert DatFile(path, cache=cache).array("speed").tolist() == [1.5, 1.5]
+
+
+def test_edited_file_gets_a_new_entry(tmp_path):
+    cache = FileCache(tmp_path / "cache")
+    path = write_dat(tmp_path / "run.dat", 1.5)
+    before = cache.entry_path(path)
+    write_dat(path, 22.5)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert cache.entry_path(path) != before
+
+
+def test_evict_drops_least_recently_used_with_sidecars(tmp_path):
+    cache = FileCache(tmp_path / "cache")
+    paths = [write_dat(tmp_path / f"run{i}.dat", i) for i in range(3)]
+    for age, path in enumerate(paths):
+        cache.store(path, DatFile(path).scan)
+        cache.sidecar_path(path, "profile").write_text("{}")
+        # Oldest first: run0 was used longest ago
+        os.utime(cache.entry_path(path), (1_000_000 + age, 1_000_000 + age))
+
+    entry_size = cache.entry_path(paths[0]).stat().st_size
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+    assert not cache.entry_path(paths[0]).exists()
+    assert not cache.sidecar_path(paths[0], "profile").exists()
+    assert cache.entry_path(paths[1]).exists() and cache.entry_path(paths[2]).exists()
+
+    cache.max_bytes = 0
+    cache.evict(keep=cache.entry_path(paths[1]))
+    assert cache.entry_path(paths[1]).exists()
+    assert not cache.entry_path(paths[2]).exists()
+
+
+def test_lookup_marks_an_entry_recently_used(tmp_path):
+    cache = FileCache(tmp_path / "cache")
+    old, new = write_dat(tmp_path / "old.dat", 1), write_dat(tmp_path / "new.dat", 2)
+    for path, mtime in ((old, 1_000_000), (new, 2_000_000)):
+        cache.store(path, DatFile(path).scan)
+        os.utime(cache.entry_path(path), (mtime, mtime))
+    cache.lookup(old)
+    cache.max_bytes = cache.entry_path(old).stat().st_size
+    cache.evict()
+    assert cache.entry_path(old).exists()
+    assert not cache.entry_path(new).exists()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get_or_compute("a", lambda: 0) == 1
+    assert cache.get_or_compute("d", lambda: 4) == 4
+    assert cache.get("c") is None
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from datHistogram import BASE_BINS, ColumnHistogram, StreamingHistogram
+
+
+@pytest.fixture(scope="module")
+def histogram():
+    return ColumnHistogram(np.random.default_rng(0).normal(size=100_000))
+
+
+@pytest.mark.parametrize("bins", [1, 7, 50, 100, 500, 1000, 2000, 3000, BASE_BINS])
+def test_fixed_count_gives_that_many_bins(histogram, bins):
+    counts, edges = histogram.bins("Fixed count", bins)
+    assert len(counts) == bins
+    assert len(edges) == bins + 1
+    assert counts.sum() == histogram.counts.sum()
+
+
+def test_fixed_count_is_capped_at_base_bins(histogram):
+    counts, _ = histogram.bins("Fixed count", 10 * BASE_BINS)
+    assert len(counts) == BASE_BINS
+
+
+@pytest.mark.parametrize("rule", ["Freedman-Diaconis", "Sturges"])
+def test_rules_keep_every_value(histogram, rule):
+    counts, edges = histogram.bins(rule)
+    assert counts.sum() == histogram.counts.sum()
+    assert np.all(np.diff(edges) > 0)
+
+
+def test_zero_filter_drops_only_exact_zeros():
+    data = np.array([0.0, 0.0, 0.0, 1.0, 2.0, -1.0])
+    histogram = ColumnHistogram(data, base_bins=8)
+    assert histogram.base_counts().sum() == 6
+    assert histogram.base_counts(drop_zeros=True).sum() == 3
+
+
+def test_non_finite_values_are_left_out():
+    histogram = ColumnHistogram(np.array([1.0, np.nan, np.inf, 2.0]))
+    assert histogram.counts.sum() == 2
+
+
+def test_constant_column_gets_a_range():
+    histogram = ColumnHistogram(np.full(10, 3.0))
+    assert histogram.counts.sum() == 10
+    assert histogram.edges[0] < 3.0 < histogram.edges[-1]
+
+
+def test_streaming_histogram_counts_every_value_as_the_range_grows():
+    rng = np.random.default_rng(1)
+    streaming = StreamingHistogram()
+    chunks = [rng.normal(size=1000), rng.normal(50, 1, size=1000), np.zeros(10)]
+    for chunk in chunks:
+        streaming.update(chunk)
+    result = streaming.histogram()
+    assert result.counts.sum() == 2010
+    assert result.zeros == 10
@@ -0,0 +1,112 @@
+import polars as pl
+import pytest
+
+from datCache import FileCache
+from datLoader import DatFile, compact_series, extend_series, prints_as_float32
+
+
+def write_dat(path, rows):
+    path.write_text("t flag speed\n" + "".join(f"{t} {flag} {speed}\n" for t, flag, speed in rows))
+    return path
+
+
+@pytest.mark.parametrize(
+    "values, dtype",
+    [
+        ([0.0, 1.0, 2.0], pl.Int8),
+        ([-200.0, 300.0], pl.Int16),
+        ([70000, -5], pl.Int32),
+        ([2**40, 1], pl.Int64),
+        ([12.345, 3.1, -0.25], pl.Float32),
+        ([0.1234567891234, 1.0], pl.Float64),
+        ([float("nan"), 1.5], pl.Float32),
+    ],
+)
+def test_compact_series_picks_the_narrowest_exact_dtype(values, dtype):
+    assert compact_series(pl.Series("x", values)).dtype == dtype
+
+
+def test_compact_series_leaves_columns_with_nulls():
+    series = pl.Series("x", [1.0, None])
+    assert compact_series(series).dtype == pl.Float64
+
+
+def test_prints_as_float32_compares_written_values():
+    assert prints_as_float32(pl.Series([12.345, 3.1]))
+    assert not prints_as_float32(pl.Series([0.1234567891234]))
+
+
+def test_extend_series_keeps_float32_for_decimal_rows():
+    stored = compact_series(pl.Series("x", [12.345, 1.5]))
+    assert stored.dtype == pl.Float32
+    extended = extend_series(stored, pl.Series("x", [3.1, 2.25]))
+    assert extended.dtype == pl.Float32
+    assert extended.len() == 4
+
+
+def test_extend_series_widening_float32_restores_written_values():
+    stored = compact_series(pl.Series("x", [12.345, 1.5]))
+    extended = extend_series(stored, pl.Series("x", [0.1234567891234]))
+    assert extended.dtype == pl.Float64
+    assert extended.to_list() == [12.345, 1.5, 0.1234567891234]
+
+
+def test_extend_series_widens_integers_that_no_longer_fit():
+    stored = compact_series(pl.Series("x", [1, 2, 3]))
+    assert stored.dtype == pl.Int8
+    assert extend_series(stored, pl.Series("x", [1000])).to_list() == [1, 2, 3, 1000]
+    assert extend_series(compact_series(pl.Series("x", [1, 2])), pl.Series("x", [5])).dtype == pl.Int8
+
+
+def test_dat_file_loads_only_requested_columns(tmp_path):
+    dat_file = DatFile(write_dat(tmp_path / "run.dat", [(0.0, 0, 1.5), (0.1, 1, 2.5)]))
+    dat_file.load(["speed"])
+    assert dat_file.is_loaded(["speed"])
+    assert not dat_file.is_loaded(["t"])
+    assert dat_file.array("speed").tolist() == [1.5, 2.5]
+    assert not dat_file.array("speed").flags.writeable
+
+
+def test_follow_reads_only_whole_lines_and_appends_new_ones(tmp_path):
+    path = write_dat(tmp_path / "run.dat", [(0.0, 0, 1.5), (0.1, 1, 2.5)])
+    with open(path, "a") as file:
+        file.write("0.2 1 3.")  # a line still being written
+    dat_file = DatFile(path)
+    dat_file.load(["t", "speed"])
+    dat_file.follow()
+    assert dat_file["speed"].len() == 2
+
+    with open(path, "a") as file:
+        file.write("1\n0.3 0 4.5\n")
+    frame, end = dat_file.read_appended()
+    assert dat_file.append(frame, end)
+    assert dat_file["speed"].cast(pl.String).to_list() == ["1.5", "2.5", "3.1", "4.5"]
+    assert dat_file["speed"].dtype == pl.Float32
+    assert dat_file["t"].len() == 4
+
+
+def test_store_false_reads_the_cache_without_writing_it(tmp_path):
+    cache = FileCache(tmp_path / "cache")
+    path = write_dat(tmp_path / "run.dat", [(0.0, 0, 1.5), (0.1, 1, 2.5)])
+    dat_file = DatFile(path, cache=cache, store=False)
+    dat_file.load(["speed"])
+    assert dat_file.cached is None
+    assert list(cache.cache_dir.iterdir()) == []
+
+    cache.store(path, DatFile(path).scan)
+    dat_file = DatFile(path, cache=cache, store=False)
+    assert dat_file.cached is not None
+    assert dat_file["speed"].to_list() == [1.5, 2.5]
+
+
+def test_array_is_rebuilt_after_append(tmp_path):
+    path = write_dat(tmp_path / "run.dat", [(0.0, 0, 1.5), (0.1, 1, 2.5)])
+    dat_file = DatFile(path)
+    dat_file.follow()
+    assert dat_file.array("speed").tolist() == [1.5, 2.5]
+    with open(path, "a") as file:
+        file.write("0.2 0 3.5\n")
+    assert dat_file.append(*dat_file.read_appended())
+    assert dat_file.array("speed").tolist() == [1.5, 2.5, 3.5]
+    with pytest.raises(KeyError):
+        dat_file.array("missing")
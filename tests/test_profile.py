@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from datCache import FileCache
+from datLoader import DatFile
+from datProfile import FileProfile, profile_columns
+
+
+@pytest.fixture
+def dat_path(tmp_path):
+    rows = 30_000
+    t = np.arange(rows) * 0.5
+    level = np.where(np.arange(rows) % 4 == 0, 0, np.arange(rows) % 7 + 1)
+    path = tmp_path / "run.dat"
+    lines = "".join(f"{a} {b} 3 {rows - i}\n" for i, (a, b) in enumerate(zip(t, level)))
+    path.write_text("t level flat down\n" + lines)
+    return path
+
+
+def check_profile(profile):
+    assert profile.columns["t"]["monotonic"] == "increasing"
+    assert profile.columns["down"]["monotonic"] == "decreasing"
+    assert profile.columns["level"]["monotonic"] is None
+    assert profile.is_constant("flat")
+    level = profile.columns["level"]
+    assert level["rows"] == 30_000
+    assert level["zeros"] == 7_500
+    assert level["stats"]["min"] == 0 and level["stats"]["max"] == 7
+    assert profile.stats("level", drop_zeros=True)["min"] == 1
+    assert profile.stats("t")["mean"] == pytest.approx(np.arange(30_000).mean() * 0.5)
+
+
+def test_profile_from_text(dat_path):
+    dat_file = DatFile(dat_path)
+    check_profile(profile_columns(dat_file, dat_file.numeric_columns()))
+    assert not dat_file.is_loaded(["t"])
+
+
+def test_profile_from_cached_copy(dat_path, tmp_path):
+    cache = FileCache(tmp_path / "cache")
+    cache.store(dat_path, DatFile(dat_path).scan)
+    dat_file = DatFile(dat_path, cache=cache)
+    assert dat_file.cached is not None
+    check_profile(profile_columns(dat_file, dat_file.numeric_columns()))
+
+
+def test_profile_save_and_load(dat_path, tmp_path):
+    dat_file = DatFile(dat_path)
+    profile = profile_columns(dat_file, dat_file.numeric_columns())
+    profile.save(tmp_path / "run.profile.json")
+    loaded = FileProfile.load(tmp_path / "run.profile.json")
+    assert loaded.columns == profile.columns
+    assert loaded.order(["t", "flat", "level"], sort_by="range") == ["t", "level"]
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from datDecimate import decimate_window, minmax_indices
+from datPyramid import ColumnPyramid
+
+
+@pytest.fixture(scope="module")
+def data():
+    return np.random.default_rng(0).normal(size=10_007).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def pyramid(data):
+    return ColumnPyramid(data)
+
+
+@pytest.mark.parametrize("lo, hi", [(0, 10_007), (3, 4), (5, 21), (17, 9_999), (8, 16), (10_000, 10_007)])
+def test_range_stats_match_numpy(data, pyramid, lo, hi):
+    values = data[lo:hi].astype(np.float64)
+    stats = pyramid.range_stats(lo, hi)
+    assert stats["count"] == hi - lo
+    assert stats["mean"] == pytest.approx(values.mean())
+    assert stats["std"] == pytest.approx(values.std(), abs=1e-9)
+    assert (stats["min"], stats["max"]) == (values.min(), values.max())
+
+
+def test_empty_range_has_no_stats(pyramid):
+    assert pyramid.range_stats(5, 5) is None
+
+
+def test_minmax_indices_keep_the_window_extremes(data):
+    # A peak just inside the window's edge block must not be lost to the block's out-of-window extreme
+    spiky = data.copy()
+    spiky[1000] = 50
+    spiky[1003] = -50
+    spiky_pyramid = ColumnPyramid(spiky)
+    indices = spiky_pyramid.minmax_indices(1001, 9_000, 200)
+    assert indices.min() >= 1001 and indices.max() < 9_000
+    assert spiky[indices].max() == spiky[1001:9_000].max()
+    assert spiky[indices].min() == spiky[1001:9_000].min()
+
+
+def test_minmax_indices_match_a_raw_scan(data, pyramid):
+    indices = pyramid.minmax_indices(0, len(data), 500)
+    raw = minmax_indices(data, 500)
+    assert len(indices) <= 2 * len(raw)
+    assert data[indices].max() == data.max() and data[indices].min() == data.min()
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_small_windows_are_returned_whole(pyramid):
+    np.testing.assert_array_equal(pyramid.minmax_indices(10, 50, 100), np.arange(10, 50))
+
+
+def test_decimate_window_with_pyramid_keeps_detail(data, pyramid):
+    x = np.arange(len(data), dtype=np.float64)
+    xs, ys = decimate_window(x, data, 2_000.0, 3_000.0, 400, pyramid=pyramid)
+    inside = (xs >= 2_000) & (xs <= 3_000)
+    assert inside.sum() > 200
+    assert ys.max() == data.max()
+
+
+def test_node_memory_is_about_six_bytes_per_sample():
+    pyramid = ColumnPyramid(np.zeros(1 << 16, dtype=np.float32))
+    size = sum(array.nbytes for level in pyramid.levels.values() for array in level.values())
+    assert size / pyramid.n < 7
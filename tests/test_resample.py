@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from datOverlay import overlay_traces
+from datResample import Resampler
+
+
+def test_interpolate_matches_linear_values():
+    x = np.arange(0, 10, 0.5)
+    resampler = Resampler(x, 4)
+    np.testing.assert_allclose(resampler.grid, np.arange(0, 9.5 + 1e-9, 0.25))
+    np.testing.assert_allclose(resampler.resample(3 * x + 1), 3 * resampler.grid + 1)
+
+
+def test_unsorted_x_is_sorted_first():
+    x = np.array([2.0, 0.0, 3.0, 1.0])
+    resampler = Resampler(x, 2)
+    np.testing.assert_allclose(resampler.resample(10 * x), 10 * resampler.grid)
+
+
+def test_mean_averages_each_bin():
+    x = np.array([0.0, 0.2, 0.4, 1.0, 1.5])
+    y = np.array([1.0, 2.0, 3.0, 10.0, 20.0])
+    resampler = Resampler(x, 1, "mean")
+    np.testing.assert_allclose(resampler.grid, [0.0, 1.0])
+    np.testing.assert_allclose(resampler.resample(y), [2.0, 15.0])
+
+
+def test_dropouts_are_left_out():
+    x = np.concatenate([np.arange(0, 10, 0.1), np.arange(20, 30, 0.1)])
+    resampler = Resampler(x, 10)
+    assert not np.any((resampler.grid > 10) & (resampler.grid < 20))
+    assert np.isfinite(resampler.resample(np.sin(x))).all()
+
+
+def test_grid_is_capped_by_a_whole_factor():
+    x = np.linspace(0, 100, 1001)
+    resampler = Resampler(x, 1000, max_points=10_000)
+    assert len(resampler.grid) <= 10_000
+    assert resampler.rate == pytest.approx(1000 / round(1000 / resampler.rate))
+
+
+def test_origin_anchors_the_grid():
+    resampler = Resampler(np.arange(0.33, 5, 0.01), 10, origin=0.0)
+    steps = resampler.grid * 10
+    np.testing.assert_allclose(steps, np.round(steps), atol=1e-9)
+    assert resampler.grid[0] >= 0.33
+
+
+def test_overlay_runs_share_the_main_grid():
+    main = Resampler(np.arange(0.5, 50, 0.01), 20)
+    x_1 = np.arange(0, 100, 0.013)
+    x_2 = np.arange(3.3, 80, 0.007)
+    runs = [("a", x_1, np.sin(x_1)), ("b", x_2, np.cos(x_2))]
+    (_, xa, ya), (_, xb, yb) = overlay_traces(runs, 4000, main.rate, "mean", main.origin)
+
+    # Both runs are sampled at the same x values wherever they overlap, and those are main grid values
+    overlap = (xa >= xb[0]) & (xa <= xb[-1])
+    np.testing.assert_array_equal(xa[overlap], xb[(xb >= xa[0]) & (xb <= xa[-1])])
+    in_main = (xa >= main.grid[0]) & (xa <= main.grid[-1])
+    assert np.isin(xa[in_main], main.grid).all()
+    assert len(xa) <= 4000 and len(xb) <= 4000
+    assert np.isfinite(ya).all() and np.isfinite(yb).all()
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from datStats import QuantileSketch, RunningStats, fused_stats, median
+
+
+@pytest.fixture(scope="module")
+def data():
+    return np.random.default_rng(0).normal(5, 3, 200_000)
+
+
+def test_running_stats_merge_matches_numpy(data):
+    parts = [RunningStats() for _ in range(3)]
+    for stats, part in zip(parts, np.array_split(data, 3)):
+        stats.update(part)
+    total = RunningStats()
+    for stats in parts:
+        total.merge(stats)
+    assert total.count == len(data)
+    assert total.mean == pytest.approx(data.mean())
+    assert total.std == pytest.approx(data.std())
+    assert (total.min, total.max) == (data.min(), data.max())
+
+
+def test_fused_stats_with_mask(data):
+    values = data.copy()
+    values[::3] = 0
+    mask = values != 0
+    stats = fused_stats(values, exact_median=True, chunk=1000, mask=mask)
+    nonzero = values[mask]
+    assert stats["mean"] == pytest.approx(nonzero.mean())
+    assert stats["std"] == pytest.approx(nonzero.std())
+    assert stats["median"] == np.median(nonzero)
+    assert (stats["min"], stats["max"]) == (nonzero.min(), nonzero.max())
+
+
+def test_fused_stats_of_empty_data():
+    stats = fused_stats(np.empty(0))
+    assert all(np.isnan(value) for value in stats.values())
+
+
+def test_sketch_median_is_close(data):
+    sketch = QuantileSketch(4096, seed=1)
+    for part in np.array_split(data, 50):
+        sketch.update(part)
+    assert len(sketch.sample()) == 4096
+    rank = np.mean(data < sketch.quantile(0.5))
+    assert rank == pytest.approx(0.5, abs=0.03)
+
+
+def test_sketch_is_not_biased_by_periodic_data():
+    # A fixed-stride sample of this keeps only the zeros
+    sketch = QuantileSketch(1024, seed=2)
+    for part in np.array_split(np.tile([0.0, 1.0], 500_000), 20):
+        sketch.update(part)
+    assert sketch.sample().mean() == pytest.approx(0.5, abs=0.06)
+    assert (sketch.quantile(0.25), sketch.quantile(0.75)) == (0.0, 1.0)
+
+
+def test_merged_sketches_sample_both_parts():
+    first, second = QuantileSketch(2048, seed=3), QuantileSketch(2048, seed=4)
+    first.update(np.zeros(100_000))
+    second.update(np.ones(100_000))
+    first.merge(second)
+    assert first.seen == 200_000
+    assert len(first.sample()) == 2048
+    assert first.sample().mean() == pytest.approx(0.5, abs=0.06)
+
+
+def test_median_estimate_uses_mask():
+    values = np.tile([0.0, 1.0, 2.0, 3.0], 50_000)
+    mask = values != 0
+    assert median(values, mask=mask) == 2.0
+    assert median(values, exact_median=True, mask=mask) == 2.0
+    assert np.isnan(median(np.empty(0)))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from datLoader import DatFile
+from datStream import STREAM_SKETCH_CAPACITY, ColumnSummary, summarize
+
+
+@pytest.fixture
+def dat_path(tmp_path):
+    rng = np.random.default_rng(0)
+    t = np.arange(50_000) * 0.01
+    speed = rng.normal(10, 2, len(t))
+    speed[::10] = 0
+    path = tmp_path / "run.dat"
+    path.write_text("t speed\n" + "".join(f"{a:.2f} {b:.4f}\n" for a, b in zip(t, speed)))
+    return path
+
+
+def test_summarize_matches_the_loaded_column(dat_path):
+    dat_file = DatFile(dat_path)
+    summary = summarize(dat_file, ["speed"], ["t"], max_points=1000)
+    speed = DatFile(dat_path, compact=False).array("speed")
+
+    stats = summary.columns["speed"].stats()
+    assert stats["mean"] == pytest.approx(speed.mean())
+    assert stats["std"] == pytest.approx(speed.std())
+    assert stats["min"] == speed.min() and stats["max"] == speed.max()
+    nonzero = summary.columns["speed"].stats(drop_zeros=True)
+    assert nonzero["median"] == pytest.approx(np.median(speed[speed != 0]), rel=0.02)
+
+    assert summary.x_ranges["t"] == (0.0, pytest.approx(499.99))
+    x, y = summary.overviews["t"]["speed"].xy()
+    assert len(x) <= 1100
+    assert y.max() == speed.max()
+
+
+def test_summarize_keeps_small_sketches(dat_path):
+    summary = summarize(DatFile(dat_path), ["speed"], [])
+    column = summary.columns["speed"]
+    for sketch in (column.all_sketch, column.nonzero_sketch):
+        # Trimmed back to capacity whenever it holds twice that
+        assert sketch.size <= 2 * STREAM_SKETCH_CAPACITY
+        assert len(sketch.sample()) == STREAM_SKETCH_CAPACITY
+
+
+def test_merged_summaries_match_one_pass():
+    data = np.random.default_rng(1).normal(size=20_000)
+    whole = ColumnSummary()
+    whole.update(data)
+    first, second = ColumnSummary(), ColumnSummary()
+    first.update(data[:7_000])
+    second.update(data[7_000:])
+    first.merge(second)
+    for key in ["mean", "std", "min", "max"]:
+        assert first.stats()[key] == pytest.approx(whole.stats()[key])
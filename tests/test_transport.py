@@ -0,0 +1,52 @@
+import base64
+
+import numpy as np
+
+from datTransport import compact_array, encode_arrays, typed_array
+
+
+def decode(spec):
+    return np.frombuffer(base64.b64decode(spec["bdata"]), dtype=spec["dtype"])
+
+
+def test_compact_array_downcasts_when_lossless_on_screen():
+    values = np.linspace(0, 100, 1000)
+    assert compact_array(values).dtype == np.float32
+
+
+def test_compact_array_keeps_float64_for_fine_detail_on_a_large_offset():
+    # Timestamps: a small span far from zero loses its detail in float32
+    values = 1.7e9 + np.arange(1000) * 1e-3
+    assert compact_array(values).dtype == np.float64
+
+
+def test_compact_array_keeps_out_of_range_values():
+    assert compact_array(np.array([1e300, 1.0])).dtype == np.float64
+    assert compact_array(np.array([np.nan, np.inf, 1.0, 2.0])).dtype == np.float32
+
+
+def test_typed_array_round_trips():
+    values = np.array([1.5, -2.25, 3.0])
+    spec = typed_array(values)
+    assert spec["dtype"] == "f8"
+    np.testing.assert_array_equal(decode(spec), values)
+
+
+def test_typed_array_sends_int64_as_float64():
+    spec = typed_array(np.array([1, 2, 3], dtype=np.int64))
+    assert spec["dtype"] == "f8"
+    np.testing.assert_array_equal(decode(spec), [1.0, 2.0, 3.0])
+
+
+def test_typed_array_falls_back_to_lists():
+    assert typed_array(np.array(["a", "b"])) == ["a", "b"]
+    assert typed_array(np.array([1.0, 2.0], dtype=">f8")) == [1.0, 2.0]
+
+
+def test_encode_arrays_walks_nested_arguments():
+    arguments = {"x": [np.arange(3, dtype=np.int32)], "layout": {"title": "t"}, "n": 2}
+    encoded = encode_arrays(arguments)
+    assert encoded["layout"] == {"title": "t"} and encoded["n"] == 2
+    assert encoded["x"][0]["dtype"] == "i4"
+    np.testing.assert_array_equal(decode(encoded["x"][0]), [0, 1, 2])
+    assert encode_arrays((np.linspace(0, 1, 5),), downcast=True)[0]["dtype"] == "f4"